@@ -6,33 +6,71 @@ and simple ML techniques for demo purposes.
 """
 
 import re
-import json
-import yaml
-from typing import List, Dict, Any, Optional
-from fastapi import FastAPI, HTTPException
+import ahocorasick
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+from fastapi import FastAPI, HTTPException, Response
 from pydantic import BaseModel
 import logging
 
+from shared import pii
+from shared.cache import ResponseCache, content_hash
+from shared.limits import check_text_length
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Document Classifier", version="1.0.0")
 
-# Load PII patterns
-try:
-    with open("/app/tech/redaction/pii_patterns.yaml", "r") as f:
-        pii_patterns = yaml.safe_load(f)
-except FileNotFoundError:
-    # Fallback patterns if file not found
+PII_PATTERNS_PATH = Path("/app/tech/redaction/pii_patterns.yaml")
+
+# Load PII patterns; the YAML overrides the shared built-in set when present
+if PII_PATTERNS_PATH.exists():
+    pii_patterns = pii.load_yaml(PII_PATTERNS_PATH)
+else:
     pii_patterns = {
-        "patterns": [
-            {"id": "ssn", "regex": r"\b(?!000|666)[0-8][0-9]{2}-?(?!00)[0-9]{2}-?(?!0000)[0-9]{4}\b"},
-            {"id": "pan", "regex": r"\b(?:\\d[ -]*?){13,19}\b"},
-            {"id": "email", "regex": r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b"}
-        ]
+        "patterns": [{"id": pii_id, "regex": regex} for pii_id, regex in pii.PATTERNS.items()]
     }
 
+# Keyword dictionaries with weights
+REGULATED_KEYWORDS = {
+    "medical": 0.3, "health": 0.3, "patient": 0.4, "diagnosis": 0.4,
+    "treatment": 0.3, "prescription": 0.4, "insurance": 0.3,
+    "financial": 0.2, "bank": 0.3, "account": 0.2, "credit": 0.3,
+    "ssn": 0.5, "social security": 0.5, "tax id": 0.4
+}
+
+CONFIDENTIAL_KEYWORDS = {
+    "personal": 0.3, "private": 0.3, "sensitive": 0.4, "confidential": 0.5,
+    "proprietary": 0.4, "internal": 0.3, "restricted": 0.4,
+    "email": 0.2, "phone": 0.2, "address": 0.2
+}
+
+INTERNAL_KEYWORDS = {
+    "business": 0.2, "company": 0.2, "strategy": 0.3, "plan": 0.2,
+    "budget": 0.3, "revenue": 0.3, "profit": 0.2, "meeting": 0.1,
+    "project": 0.2, "team": 0.1, "department": 0.2
+}
+
+# Business terms that mark a document as internal on their own
+INTERNAL_TERMS = ["strategy", "budget", "revenue", "confidential", "proprietary"]
+
+# Confidence and reason reported for each label
+LABEL_DETAILS = {
+    "Regulated": (0.9, "Contains regulated data patterns or keywords"),
+    "Confidential": (0.8, "Contains confidential information"),
+    "Internal": (0.7, "Contains internal business information"),
+    "Public": (0.6, "No sensitive patterns detected"),
+}
+
+# Score slots produced by the keyword scan
+KEYWORD_CATEGORIES = ("regulated", "confidential", "internal", "internal_terms")
+
+# PII pattern ids that determine each classification level
+REGULATED_PATTERN_IDS = ["ssn", "pan", "credit_card", "routing", "icd10", "credit_score"]
+CONFIDENTIAL_PATTERN_IDS = ["email", "phone", "address", "dob"]
+
 class ClassificationRequest(BaseModel):
     text: str
     metadata: Optional[Dict[str, Any]] = {}
@@ -52,43 +90,70 @@ class ClassificationService:
             try:
                 self.compiled_patterns[pattern["id"]] = re.compile(pattern["regex"], re.IGNORECASE)
             except re.error as e:
-                logger.warning(f"Invalid regex pattern {pattern['id']}: {e}")
+                logger.warning("Invalid regex pattern %s: %s", pattern['id'], e)
+        
+        self.category_patterns = {
+            "regulated": self._compile_category(REGULATED_PATTERN_IDS),
+            "confidential": self._compile_category(CONFIDENTIAL_PATTERN_IDS),
+        }
+        self.keyword_automaton, self.keyword_contributions = self._build_keyword_automaton()
+    
+    def _compile_category(self, pattern_ids: List[str]) -> List[re.Pattern]:
+        """Merge a category's patterns into one alternation so it is searched once.
+        
+        Falls back to the individually compiled patterns if the merged
+        expression does not compile.
+        """
+        regexes = [
+            pattern["regex"] for pattern in self.patterns
+            if pattern["id"] in pattern_ids and pattern["id"] in self.compiled_patterns
+        ]
+        if not regexes:
+            return []
+        try:
+            return [re.compile("|".join(f"(?:{regex})" for regex in regexes), re.IGNORECASE)]
+        except re.error as e:
+            logger.warning("Could not merge patterns %s: %s", pattern_ids, e)
+            return [self.compiled_patterns[pid] for pid in pattern_ids if pid in self.compiled_patterns]
+    
+    def _build_keyword_automaton(self) -> Tuple[ahocorasick.Automaton, List[Tuple[Tuple[int, float], ...]]]:
+        """Build one Aho-Corasick automaton over every classification keyword.
+        
+        Each keyword's payload is its index into the returned contribution
+        table, which lists the (category slot, weight) pairs it adds to.
+        Indices follow the keyword tables' order, so summing hits by index
+        adds weights in the same order as the tables themselves.
+        """
+        index: Dict[str, int] = {}
+        contributions: List[List[Tuple[int, float]]] = []
+        tables = (REGULATED_KEYWORDS, CONFIDENTIAL_KEYWORDS, INTERNAL_KEYWORDS,
+                  dict.fromkeys(INTERNAL_TERMS, 1.0))
+        for slot, keywords in enumerate(tables):
+            for keyword, weight in keywords.items():
+                keyword = keyword.lower()
+                if keyword not in index:
+                    index[keyword] = len(contributions)
+                    contributions.append([])
+                contributions[index[keyword]].append((slot, weight))
+        
+        automaton = ahocorasick.Automaton()
+        for keyword, keyword_id in index.items():
+            automaton.add_word(keyword, keyword_id)
+        automaton.make_automaton()
+        return automaton, [tuple(c) for c in contributions]
     
     def classify_document(self, text: str, metadata: Dict[str, Any] = None) -> ClassificationResponse:
         """Classify document based on content analysis."""
         if metadata is None:
             metadata = {}
         
-        reasons = []
-        confidence = 0.0
-        
-        # Check for sensitive patterns
-        sensitive_patterns_found = self._check_sensitive_patterns(text)
-        
-        # Check for keywords indicating classification level
-        keyword_scores = self._analyze_keywords(text)
+        label = self._determine_label(text, text.lower())
+        confidence, reason = LABEL_DETAILS[label]
+        reasons = [reason]
         
         # Check metadata hints
         metadata_hints = self._analyze_metadata(metadata)
         
-        # Determine classification
-        if sensitive_patterns_found["regulated"] or keyword_scores["regulated"] > 0.7:
-            label = "Regulated"
-            confidence = 0.9
-            reasons.append("Contains regulated data patterns or keywords")
-        elif sensitive_patterns_found["confidential"] or keyword_scores["confidential"] > 0.6:
-            label = "Confidential"
-            confidence = 0.8
-            reasons.append("Contains confidential information")
-        elif sensitive_patterns_found["internal"] or keyword_scores["internal"] > 0.5:
-            label = "Internal"
-            confidence = 0.7
-            reasons.append("Contains internal business information")
-        else:
-            label = "Public"
-            confidence = 0.6
-            reasons.append("No sensitive patterns detected")
-        
         # Adjust confidence based on metadata
         if metadata_hints:
             confidence = min(confidence + 0.1, 1.0)
@@ -100,79 +165,57 @@ class ClassificationService:
             reasons=reasons
         )
     
-    def _check_sensitive_patterns(self, text: str) -> Dict[str, bool]:
-        """Check for sensitive data patterns."""
-        results = {
-            "regulated": False,
-            "confidential": False,
-            "internal": False
-        }
+    def _determine_label(self, text: str, text_lower: str) -> str:
+        """Pick the most sensitive label the content supports.
         
-        # Check for regulated patterns (PHI, financial data)
-        regulated_patterns = ["ssn", "pan", "routing", "icd10", "credit_score"]
-        for pattern_id in regulated_patterns:
-            if pattern_id in self.compiled_patterns:
-                if self.compiled_patterns[pattern_id].search(text):
-                    results["regulated"] = True
-                    break
-        
-        # Check for confidential patterns (PII, business data)
-        confidential_patterns = ["email", "phone", "address", "dob"]
-        for pattern_id in confidential_patterns:
-            if pattern_id in self.compiled_patterns:
-                if self.compiled_patterns[pattern_id].search(text):
-                    results["confidential"] = True
-                    break
-        
-        # Check for internal patterns (business terms)
-        internal_keywords = ["strategy", "budget", "revenue", "confidential", "proprietary"]
-        for keyword in internal_keywords:
-            if keyword.lower() in text.lower():
-                results["internal"] = True
-                break
-        
-        return results
-    
-    def _analyze_keywords(self, text: str) -> Dict[str, float]:
-        """Analyze text for classification keywords."""
-        text_lower = text.lower()
-        
-        # Keyword dictionaries with weights
-        regulated_keywords = {
-            "medical": 0.3, "health": 0.3, "patient": 0.4, "diagnosis": 0.4,
-            "treatment": 0.3, "prescription": 0.4, "insurance": 0.3,
-            "financial": 0.2, "bank": 0.3, "account": 0.2, "credit": 0.3,
-            "ssn": 0.5, "social security": 0.5, "tax id": 0.4
-        }
+        Levels are tested from Regulated down and the first match wins, so
+        the scans for lower levels only run when the higher ones miss.
+        """
+        # Regulated patterns (PHI, financial data) decide without a keyword scan
+        if self._matches_category(text, "regulated"):
+            return "Regulated"
         
-        confidential_keywords = {
-            "personal": 0.3, "private": 0.3, "sensitive": 0.4, "confidential": 0.5,
-            "proprietary": 0.4, "internal": 0.3, "restricted": 0.4,
-            "email": 0.2, "phone": 0.2, "address": 0.2
-        }
+        # Check for keywords indicating classification level
+        keyword_scores = self._analyze_keywords(text_lower)
+        if keyword_scores["regulated"] > 0.7:
+            return "Regulated"
         
-        internal_keywords = {
-            "business": 0.2, "company": 0.2, "strategy": 0.3, "plan": 0.2,
-            "budget": 0.3, "revenue": 0.3, "profit": 0.2, "meeting": 0.1,
-            "project": 0.2, "team": 0.1, "department": 0.2
-        }
+        # Confidential patterns (PII, business data)
+        if keyword_scores["confidential"] > 0.6 or self._matches_category(text, "confidential"):
+            return "Confidential"
         
-        # Calculate scores
-        regulated_score = sum(weight for keyword, weight in regulated_keywords.items() 
-                            if keyword in text_lower)
-        confidential_score = sum(weight for keyword, weight in confidential_keywords.items() 
-                               if keyword in text_lower)
-        internal_score = sum(weight for keyword, weight in internal_keywords.items() 
-                           if keyword in text_lower)
-        
-        return {
-            "regulated": min(regulated_score, 1.0),
-            "confidential": min(confidential_score, 1.0),
-            "internal": min(internal_score, 1.0)
-        }
+        # Internal business terms
+        if keyword_scores["internal_terms"] > 0 or keyword_scores["internal"] > 0.5:
+            return "Internal"
+        
+        return "Public"
+    
+    def _matches_category(self, text: str, category: str) -> bool:
+        """Check whether any of a category's sensitive data patterns occur."""
+        return any(p.search(text) for p in self.category_patterns[category])
+    
+    def _analyze_keywords(self, text_lower: str) -> Dict[str, float]:
+        """Analyze lowercased text for classification keywords."""
+        # Single pass over the text; each keyword counts once however often it occurs
+        hits = 0
+        for _, keyword_id in self.keyword_automaton.iter(text_lower):
+            hits |= 1 << keyword_id
+        
+        scores = [0.0] * len(KEYWORD_CATEGORIES)
+        while hits:
+            lowest = hits & -hits
+            hits ^= lowest
+            for slot, weight in self.keyword_contributions[lowest.bit_length() - 1]:
+                scores[slot] += weight
+        
+        return {category: min(score, 1.0) for category, score in zip(KEYWORD_CATEGORIES, scores)}
     
     def _analyze_metadata(self, metadata: Dict[str, Any]) -> str:
         """Analyze metadata for classification hints."""
+        # Most requests carry no metadata; skip the hint lookups entirely
+        if not metadata:
+            return ""
+        
         hints = []
         
         # Check source
@@ -200,16 +243,25 @@ class ClassificationService:
 
 # Initialize classifier service
 classifier_service = ClassificationService()
+response_cache = ResponseCache()
 
 @app.post("/classify", response_model=ClassificationResponse)
 async def classify_document(request: ClassificationRequest):
     """Classify a document based on its content and metadata."""
+    check_text_length(request.text)
+    
     try:
-        result = classifier_service.classify_document(request.text, request.metadata)
-        logger.info(f"Classified document as {result.label} with confidence {result.confidence}")
-        return result
+        # Cached as the serialized JSON body
+        cache_key = content_hash(request.text, request.metadata)
+        body = response_cache.get(cache_key)
+        if body is None:
+            result = classifier_service.classify_document(request.text, request.metadata)
+            body = result.model_dump_json()
+            response_cache.put(cache_key, body)
+            logger.info("Classified document as %s with confidence %s", result.label, result.confidence)
+        return Response(content=body, media_type="application/json")
     except Exception as e:
-        logger.error(f"Classification error: {e}")
+        logger.error("Classification error: %s", e)
         raise HTTPException(status_code=500, detail=f"Classification failed: {str(e)}")
 
 @app.get("/health")
@@ -5,14 +5,19 @@ This service executes guardrail policies defined in YAML format to enforce
 business logic, safety constraints, and compliance rules on RAG outputs.
 """
 
-import re
-import yaml
+import operator
 import logging
-from typing import List, Dict, Any, Optional
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple, Callable, Awaitable
 from pathlib import Path
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response
 from pydantic import BaseModel
 import aiohttp
+import ahocorasick
+
+from shared import pii
+from shared.cache import ResponseCache, content_hash
+from shared.limits import check_text_length
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -23,6 +28,69 @@ app = FastAPI(title="Guardrails Service", version="1.0.0")
 # Load guardrails DSL configuration
 GUARDRAILS_CONFIG_PATH = Path("/app/tech/guardrails/guardrails.dsl.yaml")
 
+TOXIC_KEYWORDS = [
+    'hate', 'violence', 'offensive', 'discriminatory',
+    'explicit', 'inappropriate', 'threatening'
+]
+
+UNCERTAINTY_PHRASES = [
+    "i think", "maybe", "possibly", "might be",
+    "not sure", "uncertain", "could be"
+]
+
+def build_automaton(keywords: List[str]) -> ahocorasick.Automaton:
+    """Compile a keyword list into an Aho-Corasick automaton.
+    
+    Each keyword's payload is its own bit, so hits can be OR-ed into a mask.
+    """
+    automaton = ahocorasick.Automaton()
+    for index, keyword in enumerate(keywords):
+        automaton.add_word(keyword, 1 << index)
+    automaton.make_automaton()
+    return automaton
+
+def count_keywords(automaton: ahocorasick.Automaton, text_lower: str) -> int:
+    """Count distinct keywords present in text with a single pass.
+    
+    The walk stops as soon as every keyword has been seen; counts are
+    reported as is, so only the callers' scores saturate.
+    """
+    limit = len(automaton)
+    hits = 0
+    count = 0
+    for _, bit in automaton.iter(text_lower):
+        if not hits & bit:
+            hits |= bit
+            count += 1
+            if count >= limit:
+                break
+    return count
+
+TOXIC_AUTOMATON = build_automaton(TOXIC_KEYWORDS)
+UNCERTAINTY_AUTOMATON = build_automaton(UNCERTAINTY_PHRASES)
+
+# Match counts at which the toxicity and hallucination scores reach 1.0
+TOXICITY_SATURATION = 10
+UNCERTAINTY_SATURATION = 5
+
+# Assertion operators: each takes (actual value, expected value)
+ASSERTION_OPS = {
+    'eq': operator.eq,
+    'ne': operator.ne,
+    'gt': operator.gt,
+    'gte': operator.ge,
+    'lt': operator.lt,
+    'lte': operator.le,
+}
+
+# Prefix of the actions_taken entry recorded when a mutating action fires
+ACTION_LABELS = {
+    'refuse': 'Refused',
+    'mask_and_log': 'Masked',
+    'fallback_or_refuse': 'Fallback',
+    'truncate': 'Truncated',
+}
+
 class GuardrailCheck(BaseModel):
     id: str
     when: str  # pre_generation, post_generation, pre_return
@@ -34,6 +102,16 @@ class GuardrailsConfig(BaseModel):
     version: str
     checks: List[GuardrailCheck]
 
+@dataclass(slots=True)
+class CompiledCheck:
+    """A guardrail check resolved at config-load time for the request path."""
+    id: str
+    runner: Callable[[str, str, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+    rules: List[Tuple[Callable[[Any, Any], bool], str, Any]]
+    action: str
+    message: str
+    action_note: str
+
 class GuardrailRequest(BaseModel):
     text: str
     context: Optional[Dict[str, Any]] = {}
@@ -49,22 +127,39 @@ class GuardrailResponse(BaseModel):
 class GuardrailsEngine:
     def __init__(self):
         self.config: Optional[GuardrailsConfig] = None
+        self.checks_by_stage: Dict[str, List[CompiledCheck]] = {}
+        self.config_mtime_ns: Optional[int] = None
+        # Scan results keyed by content hash, shared across stages
+        self.scan_cache = ResponseCache()
         self.load_config()
     
     def load_config(self):
-        """Load guardrails configuration from YAML file."""
+        """Load guardrails configuration from YAML file.
+        
+        The file is only re-parsed when its modification time has changed
+        since the last successful load.
+        """
         try:
             if GUARDRAILS_CONFIG_PATH.exists():
-                with open(GUARDRAILS_CONFIG_PATH, 'r') as f:
-                    config_data = yaml.safe_load(f)
-                    self.config = self.parse_config(config_data)
-                    logger.info(f"Loaded {len(self.config.checks)} guardrail checks")
+                mtime_ns = GUARDRAILS_CONFIG_PATH.stat().st_mtime_ns
+                if self.config is not None and mtime_ns == self.config_mtime_ns:
+                    logger.info("Config unchanged, keeping loaded checks")
+                    return
+                
+                config_data = pii.load_yaml(GUARDRAILS_CONFIG_PATH)
+                self.config = self.parse_config(config_data)
+                self.config_mtime_ns = mtime_ns
+                logger.info("Loaded %d guardrail checks", len(self.config.checks))
             else:
-                logger.warning(f"Config file not found: {GUARDRAILS_CONFIG_PATH}")
+                logger.warning("Config file not found: %s", GUARDRAILS_CONFIG_PATH)
                 self.config = self.get_default_config()
+                self.config_mtime_ns = None
         except Exception as e:
-            logger.error(f"Failed to load config: {e}")
+            logger.error("Failed to load config: %s", e)
             self.config = self.get_default_config()
+            self.config_mtime_ns = None
+        
+        self.checks_by_stage = self.compile_checks(self.config)
     
     def parse_config(self, config_data: Dict[str, Any]) -> GuardrailsConfig:
         """Parse YAML config into GuardrailsConfig model."""
@@ -84,6 +179,39 @@ class GuardrailsEngine:
             checks=checks
         )
     
+    def compile_checks(self, config: GuardrailsConfig) -> Dict[str, List[CompiledCheck]]:
+        """Group checks by stage and bind each one to its runner."""
+        runners = {
+            'pii_scan': self.run_pii_scan,
+            'toxicity_scan': self.scan_toxicity,
+            'hallucination_score': self.check_hallucination,
+            'length_check': self.run_length_check,
+            'llm_judge': self.llm_judge,
+        }
+        
+        checks_by_stage: Dict[str, List[CompiledCheck]] = {}
+        for check in config.checks:
+            check_type = check.run.get('type')
+            runner = runners.get(check_type)
+            if runner is None:
+                logger.warning("Unknown check type: %s", check_type)
+                runner = self.run_unknown_check
+            
+            action = check.on_fail.get('action', 'log')
+            message = check.on_fail.get('message', f'Check {check.id} failed')
+            # The actions_taken entry is fixed per check, so build it once here
+            label = ACTION_LABELS.get(action)
+            checks_by_stage.setdefault(check.when, []).append(CompiledCheck(
+                id=check.id,
+                runner=runner,
+                rules=self.compile_assertions(check.id, check.assert_rules),
+                action=action,
+                message=message,
+                action_note=f"{label}: {message}" if label else ""
+            ))
+        
+        return checks_by_stage
+    
     def get_default_config(self) -> GuardrailsConfig:
         """Return default guardrails configuration."""
         return GuardrailsConfig(
@@ -135,42 +263,49 @@ class GuardrailsEngine:
         warnings: List[str] = []
         actions_taken: List[str] = []
         modified_text = text
+        text_lower = text.lower()
         
-        # Filter checks by stage
-        relevant_checks = [c for c in self.config.checks if c.when == stage]
-        
-        for check in relevant_checks:
+        for check in self.checks_by_stage.get(stage, []):
             try:
+                checked_text = modified_text
+                
                 # Execute the check
-                result = await self.run_check(check, modified_text, context)
+                result = await check.runner(checked_text, text_lower, context)
                 
                 # Evaluate assertions
-                passed = self.evaluate_assertions(check.assert_rules, result)
+                passed = self.evaluate_assertions(check.rules, result)
                 
                 if not passed:
                     failed_checks.append(check.id)
                     
                     # Execute failure action
-                    action = check.on_fail.get('action', 'log')
-                    message = check.on_fail.get('message', f'Check {check.id} failed')
+                    action = check.action
+                    if check.action_note:
+                        actions_taken.append(check.action_note)
                     
                     if action == 'refuse':
-                        actions_taken.append(f"Refused: {message}")
-                        modified_text = f"[BLOCKED: {message}]"
+                        # The response is blocked; later checks would only
+                        # rescan the placeholder
+                        modified_text = f"[BLOCKED: {check.message}]"
+                        break
                     elif action == 'mask_and_log':
-                        actions_taken.append(f"Masked: {message}")
-                        modified_text = self.mask_sensitive_content(modified_text, result)
+                        masked_text = result.get("masked_text")
+                        if masked_text is None:
+                            masked_text = self.mask_sensitive_content(modified_text, result)
+                        modified_text = masked_text
                     elif action == 'fallback_or_refuse':
-                        actions_taken.append(f"Fallback: {message}")
                         modified_text = "I cannot provide a confident answer to this query."
                     elif action == 'truncate':
-                        actions_taken.append(f"Truncated: {message}")
-                        modified_text = modified_text[:5000]
+                        if len(modified_text) > 5000:
+                            modified_text = modified_text[:5000]
                     else:
-                        warnings.append(message)
+                        warnings.append(check.message)
+                    
+                    if modified_text is not checked_text:
+                        text_lower = modified_text.lower()
                 
             except Exception as e:
-                logger.error(f"Error executing check {check.id}: {e}")
+                logger.error("Error executing check %s: %s", check.id, e)
                 warnings.append(f"Check {check.id} encountered an error")
         
         return GuardrailResponse(
@@ -181,87 +316,84 @@ class GuardrailsEngine:
             modified_text=modified_text if modified_text != text else None
         )
     
-    async def run_check(
+    async def run_pii_scan(
         self,
-        check: GuardrailCheck,
         text: str,
+        text_lower: str,
         context: Dict[str, Any]
     ) -> Dict[str, Any]:
-        """Run a specific guardrail check."""
-        check_type = check.run.get('type')
-        
-        if check_type == 'pii_scan':
-            return self.scan_pii(text)
-        elif check_type == 'toxicity_scan':
-            return await self.scan_toxicity(text)
-        elif check_type == 'hallucination_score':
-            return await self.check_hallucination(text, context)
-        elif check_type == 'length_check':
-            return {"length": len(text)}
-        elif check_type == 'llm_judge':
-            return await self.llm_judge(text, context)
-        else:
-            logger.warning(f"Unknown check type: {check_type}")
-            return {"score": 0, "detected": False}
+        """Runner for pii_scan checks; the masked text rides along for mask_and_log."""
+        scan_result, masked_text = self.scan_and_mask(text)
+        return {**scan_result, "masked_text": masked_text}
     
-    def scan_pii(self, text: str) -> Dict[str, Any]:
-        """Scan text for PII patterns."""
-        pii_patterns = {
-            'ssn': r'\b(?!000|666)[0-8][0-9]{2}-?(?!00)[0-9]{2}-?(?!0000)[0-9]{4}\b',
-            'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
-            'phone': r'\b(?:\(?([0-9]{3})\)?[-. ]?)?([0-9]{3})[-. ]?([0-9]{4})\b',
-            'credit_card': r'\b(?:\d[ -]*?){13,19}\b'
-        }
-        
-        detected_types = []
-        for pii_type, pattern in pii_patterns.items():
-            if re.search(pattern, text, re.IGNORECASE):
-                detected_types.append(pii_type)
+    async def run_length_check(
+        self,
+        text: str,
+        text_lower: str,
+        context: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Runner for length_check checks."""
+        return {"length": len(text)}
+    
+    async def run_unknown_check(
+        self,
+        text: str,
+        text_lower: str,
+        context: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Runner for check types this engine does not implement."""
+        return {"score": 0, "detected": False}
+    
+    def scan_and_mask(self, text: str) -> Tuple[Dict[str, Any], str]:
+        """Scan text for PII patterns and mask them in the same pass."""
+        cache_key = content_hash(text, "pii")
+        cached = self.scan_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
-        return {
-            "detected": len(detected_types) > 0,
-            "types": detected_types,
-            "count": len(detected_types)
-        }
+        result = pii.scan_and_mask(text)
+        self.scan_cache.put(cache_key, result)
+        return result
     
-    async def scan_toxicity(self, text: str) -> Dict[str, Any]:
+    async def scan_toxicity(
+        self,
+        text: str,
+        text_lower: str,
+        context: Dict[str, Any]
+    ) -> Dict[str, Any]:
         """Scan text for toxic content (simplified implementation)."""
-        toxic_keywords = [
-            'hate', 'violence', 'offensive', 'discriminatory',
-            'explicit', 'inappropriate', 'threatening'
-        ]
+        cache_key = content_hash(text_lower, "toxicity")
+        cached = self.scan_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
-        text_lower = text.lower()
-        toxic_count = sum(1 for keyword in toxic_keywords if keyword in text_lower)
+        toxic_count = count_keywords(TOXIC_AUTOMATON, text_lower)
         
         # Simple scoring: 0-1 scale
-        score = min(toxic_count / 10, 1.0)
+        score = min(toxic_count / TOXICITY_SATURATION, 1.0)
         
-        return {
+        result = {
             "score": score,
             "is_toxic": score > 0.3,
             "matches": toxic_count
         }
+        self.scan_cache.put(cache_key, result)
+        return result
     
     async def check_hallucination(
         self,
         text: str,
+        text_lower: str,
         context: Dict[str, Any]
     ) -> Dict[str, Any]:
         """Check for potential hallucinations (simplified)."""
         # In production, this would use an LLM or specialized model
         # For demo, we check for certain patterns
         
-        confidence_phrases = [
-            "i think", "maybe", "possibly", "might be",
-            "not sure", "uncertain", "could be"
-        ]
-        
-        text_lower = text.lower()
-        uncertainty_count = sum(1 for phrase in confidence_phrases if phrase in text_lower)
+        uncertainty_count = count_keywords(UNCERTAINTY_AUTOMATON, text_lower)
         
         # More uncertainty = higher hallucination risk
-        score = min(uncertainty_count / 5, 1.0)
+        score = min(uncertainty_count / UNCERTAINTY_SATURATION, 1.0)
         
         return {
             "score": score,
@@ -269,7 +401,12 @@ class GuardrailsEngine:
             "uncertainty_markers": uncertainty_count
         }
     
-    async def llm_judge(self, text: str, context: Dict[str, Any]) -> Dict[str, Any]:
+    async def llm_judge(
+        self,
+        text: str,
+        text_lower: str,
+        context: Dict[str, Any]
+    ) -> Dict[str, Any]:
         """Use LLM to judge response quality (simplified)."""
         # In production, this would call an LLM API
         # For demo, we do basic quality checks
@@ -291,74 +428,67 @@ class GuardrailsEngine:
             "quality": "good" if quality_score > 0.7 else "poor"
         }
     
+    def compile_assertions(
+        self,
+        check_id: str,
+        assertions: List[Dict[str, Any]]
+    ) -> List[Tuple[Callable[[Any, Any], bool], str, Any]]:
+        """Translate assertion rules into (operator, key, value) tuples."""
+        rules = []
+        for assertion in assertions:
+            op = assertion.get('op')
+            op_fn = ASSERTION_OPS.get(op)
+            if op_fn is None:
+                logger.warning("Ignoring unknown assertion op %r in check %s", op, check_id)
+                continue
+            rules.append((op_fn, assertion.get('key'), assertion.get('value')))
+        return rules
+    
     def evaluate_assertions(
         self,
-        assertions: List[Dict[str, Any]],
+        rules: List[Tuple[Callable[[Any, Any], bool], str, Any]],
         result: Dict[str, Any]
     ) -> bool:
-        """Evaluate assertion rules against check results."""
-        for assertion in assertions:
-            op = assertion.get('op')
-            key = assertion.get('key')
-            value = assertion.get('value')
-            
-            actual_value = result.get(key)
-            
-            if op == 'eq' and actual_value != value:
-                return False
-            elif op == 'ne' and actual_value == value:
-                return False
-            elif op == 'gt' and not (actual_value > value):
-                return False
-            elif op == 'gte' and not (actual_value >= value):
-                return False
-            elif op == 'lt' and not (actual_value < value):
-                return False
-            elif op == 'lte' and not (actual_value <= value):
-                return False
-        
-        return True
+        """Evaluate compiled assertion rules against check results."""
+        return all(op_fn(result.get(key), value) for op_fn, key, value in rules)
     
     def mask_sensitive_content(self, text: str, scan_result: Dict[str, Any]) -> str:
         """Mask sensitive content detected in text."""
-        masked_text = text
-        
-        # Mask PII patterns
-        pii_patterns = {
-            'ssn': (r'\b(?!000|666)[0-8][0-9]{2}-?(?!00)[0-9]{2}-?(?!0000)[0-9]{4}\b', 'XXX-XX-XXXX'),
-            'email': (r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', '***@***.***'),
-            'phone': (r'\b(?:\(?([0-9]{3})\)?[-. ]?)?([0-9]{3})[-. ]?([0-9]{4})\b', '(XXX) XXX-XXXX'),
-            'credit_card': (r'\b(?:\d[ -]*?){13,19}\b', '****-****-****-XXXX')
-        }
-        
-        for pii_type, (pattern, replacement) in pii_patterns.items():
-            masked_text = re.sub(pattern, replacement, masked_text, flags=re.IGNORECASE)
-        
-        return masked_text
+        return pii.mask(text)
 
 # Initialize engine
 guardrails_engine = GuardrailsEngine()
+response_cache = ResponseCache()
 
 @app.post("/guardrails/check", response_model=GuardrailResponse)
 async def check_guardrails(request: GuardrailRequest):
     """Execute guardrails checks on text."""
+    check_text_length(request.text)
+    
     try:
-        result = await guardrails_engine.execute_guardrails(
-            request.text,
-            request.context,
-            request.stage
-        )
-        
-        logger.info(
-            f"Guardrails check: stage={request.stage}, "
-            f"passed={result.passed}, "
-            f"failed={len(result.failed_checks)}"
-        )
+        # Cached as the serialized JSON body
+        cache_key = content_hash(request.text, request.context, request.stage)
+        body = response_cache.get(cache_key)
+        if body is None:
+            result = await guardrails_engine.execute_guardrails(
+                request.text,
+                request.context,
+                request.stage
+            )
+            body = result.model_dump_json()
+            response_cache.put(cache_key, body)
+            
+            logger.info(
+                "Guardrails check: stage=%s, passed=%s, failed=%d",
+                request.stage,
+                result.passed,
+                len(result.failed_checks)
+            )
         
-        return result
+        return Response(content=body, media_type="application/json")
         
     except Exception as e:
-        logger.error(f"Guardrails check error: {e}")
+        logger.error("Guardrails check error: %s", e)
         raise HTTPException(status_code=500, detail=f"Guardrails check failed: {str(e)}")
 
 @app.get("/guardrails/config")
@@ -384,6 +514,7 @@ async def reload_config():
     """Reload guardrails configuration from file."""
     try:
         guardrails_engine.load_config()
+        response_cache.clear()
         return {
             "message": "Configuration reloaded",
             "checks_loaded": len(guardrails_engine.config.checks) if guardrails_engine.config else 0
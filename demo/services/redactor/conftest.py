@@ -0,0 +1,65 @@
+"""
+Shared fixtures for the redactor tests.
+"""
+
+import sys
+import random
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import main
+
+REPO_PATTERNS_PATH = Path(__file__).resolve().parents[3] / "tech" / "redaction" / "pii_patterns.yaml"
+
+EXAMPLES = [
+    "123-45-6789", "123456789", "4111 1111 1111 1111", "4111-1111-1111-1111",
+    "A12.3", "z99", "john.doe@example.com", "X@Y.ORG", "(555) 123-4567",
+    "555.123.4567", "123 Main Street", "42\tOak Ave", "12/31/1985", "01-02-2003",
+    "850", "12345678901", "192.168.0.1",
+]
+
+ARABIC_INDIC_DIGITS = str.maketrans("0123456789", "٠١٢٣٤٥٦٧٨٩")
+FULLWIDTH_DIGITS = str.maketrans("0123456789", "０１２３４５６７８９")
+
+# Characters where re's Unicode semantics, Hyperscan and the literal
+# checks are most likely to disagree
+EDGE_CHARS = [
+    " ", "\n", "\t", "\x0b", "\x0c", "\r", "\x1c", "\x1d", "\x1e", "\x1f",
+    "\x85", " ", " ", "　", "-", ".", "/", "@", "(", ")",
+    "٣", "１", "é", "ſ", "K", "İ",
+]
+
+def build_corpus():
+    corpus = list(EXAMPLES)
+    for digits in (ARABIC_INDIC_DIGITS, FULLWIDTH_DIGITS):
+        corpus += [example.translate(digits) for example in EXAMPLES]
+    for example in EXAMPLES:
+        corpus += [example.upper(), example.lower(), f"see {example} here"]
+        for char in EDGE_CHARS:
+            corpus += [char + example + char, example.replace(" ", char)]
+            corpus += [example.replace("1", char), example.replace("s", char)]
+    rng = random.Random(1234)
+    alphabet = list("0123456789 -./@()abcdestxyzABCDESTXYZ") + EDGE_CHARS
+    for _ in range(2000):
+        parts = [rng.choice(alphabet) for _ in range(rng.randint(0, 12))]
+        parts.insert(rng.randint(0, len(parts)), rng.choice(EXAMPLES))
+        corpus.append("".join(parts))
+    return corpus
+
+@pytest.fixture(scope="session")
+def corpus():
+    """Texts mixing pattern examples with characters the engines treat differently."""
+    return build_corpus()
+
+@pytest.fixture(scope="session")
+def service(tmp_path_factory):
+    """A RedactionService loaded from the repository's pattern file."""
+    with pytest.MonkeyPatch.context() as mp:
+        cache_dir = tmp_path_factory.mktemp("redactor-cache")
+        mp.setattr(main, "PII_PATTERNS_PATH", REPO_PATTERNS_PATH)
+        mp.setattr(main, "PII_PATTERNS_CACHE_DIR", cache_dir)
+        mp.setattr(main, "PII_PATTERNS_CACHE_PATH", cache_dir / "pii_patterns.json")
+        yield main.RedactionService()
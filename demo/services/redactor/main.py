@@ -5,22 +5,331 @@ This service provides pattern-based and context-aware redaction of sensitive
 information based on document classification and policy rules.
 """
 
+import os
 import re
-import yaml
+import json
+import asyncio
+import codecs
+import heapq
 import logging
-from typing import List, Dict, Any, Optional
+import threading
+import warnings
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace as dataclass_replace
+from typing import List, Dict, Any, Optional, Tuple, Set, Callable, Iterator
 from pathlib import Path
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
 
+from shared.cache import ResponseCache, content_hash
+
+# The stdlib regex parser, used to find characters a pattern cannot match without
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:
+    import sre_parse, sre_constants
+
+# RE2 matches in linear time, so hostile input cannot trigger catastrophic
+# backtracking; it is optional and rejects some syntax such as lookarounds
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+# Hyperscan scans for all patterns in one pass and is used as an optional
+# prefilter that rules out patterns before the regex engines run
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Redaction Service", version="1.0.0")
+# orjson serializes large redacted_text payloads much faster than json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start loading patterns in the background, so startup does not wait for them."""
+    global _init_future
+    _init_future = asyncio.get_running_loop().run_in_executor(None, init_redaction_service)
+    yield
+
+app = FastAPI(
+    title="Redaction Service",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse if orjson is not None else JSONResponse
+)
 
 # Load PII patterns
 PII_PATTERNS_PATH = Path("/app/tech/redaction/pii_patterns.yaml")
+# Parsed copy of the YAML, reused while the YAML's mtime and size are
+# unchanged. It lives in a directory owned by the service because the
+# patterns directory is a bind mount of the repository
+PII_PATTERNS_CACHE_DIR = Path(os.environ.get("PII_PATTERNS_CACHE_DIR", "/var/cache/redactor"))
+PII_PATTERNS_CACHE_PATH = PII_PATTERNS_CACHE_DIR / "pii_patterns.json"
+
+def read_patterns_file() -> Dict[str, Any]:
+    """Read the patterns file, preferring its JSON sidecar when up to date.
+    
+    The sidecar records the (st_mtime_ns, st_size) of the YAML it was
+    parsed from and is only used while they are equal; a YAML replaced by
+    an older file is parsed again. After parsing the YAML, the sidecar is
+    refreshed on a best-effort basis.
+    """
+    stat = PII_PATTERNS_PATH.stat()
+    source = [stat.st_mtime_ns, stat.st_size]
+    try:
+        with open(PII_PATTERNS_CACHE_PATH, 'r') as f:
+            cached = json.load(f)
+        if cached.get("source") == source:
+            return cached["data"]
+    except (OSError, ValueError, AttributeError, KeyError):
+        pass
+    
+    # PyYAML is only needed when the sidecar is stale, so import it here;
+    # prefer the libyaml-backed loader when PyYAML was built with it
+    import yaml
+    try:
+        from yaml import CSafeLoader as YamlLoader
+    except ImportError:
+        from yaml import SafeLoader as YamlLoader
+    
+    with open(PII_PATTERNS_PATH, 'r') as f:
+        data = yaml.load(f, Loader=YamlLoader)
+    
+    try:
+        PII_PATTERNS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        temp_path = PII_PATTERNS_CACHE_PATH.with_suffix(".json.tmp")
+        with open(temp_path, 'w') as f:
+            json.dump({"source": source, "data": data}, f)
+        os.replace(temp_path, PII_PATTERNS_CACHE_PATH)
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning(f"Could not write patterns cache {PII_PATTERNS_CACHE_PATH}: {e}")
+    return data
+
+# Cumulative sensitivity buckets; "all" also covers low and unrecognized levels
+SENSITIVITY_BUCKETS = {
+    "none": (),
+    "critical": ("critical",),
+    "critical_high": ("critical", "high"),
+    "critical_high_medium": ("critical", "high", "medium"),
+}
+
+# Sensitivity bucket redacted for each classification and level:
+# Public is minimal, Internal standard, Confidential aggressive, and
+# Regulated always uses every pattern. Unknown classifications ("")
+# get standard redaction.
+SENSITIVITY_TIERS = {
+    "Public": {"minimal": "none", "standard": "critical", "strict": "critical_high"},
+    "Internal": {"minimal": "critical", "standard": "critical_high", "strict": "critical_high_medium"},
+    "Confidential": {"minimal": "critical_high", "standard": "critical_high_medium", "strict": "all"},
+    "Regulated": {"minimal": "all", "standard": "all", "strict": "all"},
+    "": {"minimal": "critical_high", "standard": "critical_high", "strict": "critical_high"},
+}
+
+REDACTION_LEVELS = ("minimal", "standard", "strict")
+
+# Where matches of different patterns overlap, the more sensitive one wins
+SENSITIVITY_RANK = {"critical": 3, "high": 2, "medium": 1, "low": 0}
+
+if re2 is not None:
+    RE2_OPTIONS = re2.Options()
+    RE2_OPTIONS.case_sensitive = False
+    RE2_OPTIONS.log_errors = False
+
+if hyperscan is not None:
+    # Exact matching first; prefilter mode approximates unsupported syntax
+    # such as lookarounds with a pattern that matches a superset
+    HS_MODES = (
+        hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH,
+        hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_PREFILTER,
+    )
+
+# Per-pattern sweeps over large texts are spread across threads. RE2
+# releases the GIL while matching; stdlib re does not, so without RE2 (or
+# with a single core) the sweep stays serial
+PARALLEL_SCAN_MIN_LEN = 4096
+PATTERN_POOL = (
+    ThreadPoolExecutor(max_workers=min(8, os.cpu_count()), thread_name_prefix="pattern-scan")
+    if re2 is not None and (os.cpu_count() or 1) > 1
+    else None
+)
+
+# /redact-stream reads the body in chunks of this many bytes. A match is only
+# final once twice the longest match of the tier's patterns follows it.
+# Unbounded patterns count as STREAM_MAX_MATCH_LEN long, so their longer
+# matches may be cut or missed
+STREAM_CHUNK_SIZE = 64 * 1024
+STREAM_MAX_MATCH_LEN = 512
+
+# Requests are matched off the event loop so one large text does not stall
+# every other request on this worker
+_EXECUTOR = ThreadPoolExecutor(max_workers=(os.cpu_count() or 1) * 2, thread_name_prefix="redact")
+
+def compile_regex(regex: str) -> Tuple[Any, str]:
+    """Compile a case-insensitive regex, preferring RE2 over the stdlib engine.
+    
+    Returns the compiled pattern and the name of the engine that accepted it.
+    Raises re.error if neither engine can compile the regex. Regexes with $
+    stay on re, since RE2's $ does not match before a trailing newline.
+    """
+    if re2 is not None and "$" not in regex:
+        try:
+            return re2.compile(regex, RE2_OPTIONS), "re2"
+        except re2.error:
+            pass
+    return re.compile(regex, re.IGNORECASE), "re"
+
+def compile_on(regex: Any, engine: str) -> Any:
+    """Compile a case-insensitive str or bytes regex on the named engine.
+    
+    Raises re.error, or ValueError for RE2, if the engine rejects the regex.
+    """
+    if engine == "re2":
+        try:
+            return re2.compile(regex, RE2_OPTIONS)
+        except re2.error as e:
+            raise ValueError(str(e))
+    return re.compile(regex, re.IGNORECASE)
+
+def compile_stdlib(regex: str) -> Optional[Any]:
+    """Compile a case-insensitive regex on re, if re reads it the way RE2 does.
+    
+    Returns None when re rejects the regex, or warns that it reads syntax
+    such as [[:digit:]] differently from RE2.
+    """
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", FutureWarning)
+        try:
+            # Parsed directly, as re.compile skips the warning for cached regexes
+            sre_parse.parse(regex, re.IGNORECASE)
+        except (re.error, FutureWarning):
+            return None
+    return re.compile(regex, re.IGNORECASE)
+
+# ASCII characters re's str \s matches but RE2's does not. RE2's \d, \s, \w
+# and \b only cover ASCII, so it matches like re only on ASCII text
+# without these; other text is redacted with the patterns compiled on re
+RE2_MISMATCHED = re.compile(r"[\x0b\x1c-\x1f]")
+
+# ASCII characters re's str \s matches but its bytes \s does not; bodies
+# with them, or with non-ASCII bytes, are decoded and redacted as text
+BYTES_MISMATCHED = re.compile(rb"[\x1c-\x1f]")
+
+def needs_stdlib(text: str) -> bool:
+    """Whether RE2 could match text differently from re."""
+    return not text.isascii() or RE2_MISMATCHED.search(text) is not None
+
+DIGIT = re.compile(r"\d")
+
+# ASCII characters re's str \s matches but Hyperscan's does not; texts with
+# them are prefiltered without Hyperscan so no pattern is wrongly ruled out
+HS_MISMATCHED = re.compile(r"[\x1c-\x1f]")
+
+REPEAT_OPS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT}
+if hasattr(sre_constants, "POSSESSIVE_REPEAT"):
+    REPEAT_OPS.add(sre_constants.POSSESSIVE_REPEAT)
+
+def _is_digit_set(items: List[Tuple[Any, Any]]) -> bool:
+    """Whether a parsed character set only contains decimal digits."""
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            if not 48 <= av <= 57:
+                return False
+        elif op is sre_constants.RANGE:
+            if not (48 <= av[0] and av[1] <= 57):
+                return False
+        elif not (op is sre_constants.CATEGORY and av is sre_constants.CATEGORY_DIGIT):
+            return False
+    return True
+
+def _required(items: Any) -> Tuple[Set[str], bool]:
+    """Collect literals and digit requirements of a parsed regex sequence."""
+    literals: Set[str] = set()
+    needs_digit = False
+    for op, av in items:
+        if op is sre_constants.LITERAL:
+            char = chr(av)
+            # Only characters without case variants can be tested with `in`
+            if char.isascii() and not char.isalpha():
+                literals.add(char)
+            needs_digit |= char.isdigit()
+        elif op is sre_constants.IN:
+            needs_digit |= _is_digit_set(av)
+        elif op in REPEAT_OPS:
+            low, _, body = av
+            if low >= 1:
+                body_literals, body_digit = _required(body)
+                literals |= body_literals
+                needs_digit |= body_digit
+        elif op is sre_constants.SUBPATTERN:
+            group_literals, group_digit = _required(av[-1])
+            literals |= group_literals
+            needs_digit |= group_digit
+        elif op is sre_constants.BRANCH:
+            branches = [_required(branch) for branch in av[1]]
+            literals |= set.intersection(*(branch_literals for branch_literals, _ in branches))
+            needs_digit |= all(branch_digit for _, branch_digit in branches)
+    return literals, needs_digit
+
+def required_features(regex: str) -> Tuple[Tuple[str, ...], bool]:
+    """Find characters every match of regex contains, and whether it has a digit.
+    
+    Texts lacking them cannot match, so the pattern can be skipped without
+    running it. Regexes the stdlib parser cannot read report nothing.
+    """
+    try:
+        literals, needs_digit = _required(sre_parse.parse(regex))
+    except Exception:
+        return (), False
+    return tuple(sorted(literals)), needs_digit
+
+def _lookaround_len(items: Any) -> int:
+    """Total longest width of the lookarounds in a parsed regex sequence."""
+    total = 0
+    for op, av in items:
+        if op in (sre_constants.ASSERT, sre_constants.ASSERT_NOT):
+            total += av[1].getwidth()[1] + _lookaround_len(av[1])
+        elif op in REPEAT_OPS:
+            total += _lookaround_len(av[2])
+        elif op is sre_constants.SUBPATTERN:
+            total += _lookaround_len(av[-1])
+        elif op is sre_constants.BRANCH:
+            total += sum(_lookaround_len(branch) for branch in av[1])
+    return total
+
+def max_match_len(regex: str) -> int:
+    """Longest match of regex in characters, capped at STREAM_MAX_MATCH_LEN.
+    
+    The text its lookarounds read beyond the match is counted too, since a
+    match is only final once that text is known. Unbounded repeats, and
+    regexes the stdlib parser cannot read, get the cap.
+    """
+    try:
+        parsed = sre_parse.parse(regex)
+        return min(parsed.getwidth()[1] + _lookaround_len(parsed), STREAM_MAX_MATCH_LEN)
+    except Exception:
+        return STREAM_MAX_MATCH_LEN
+
+def tier_key(classification: str, redaction_level: str) -> Tuple[str, str]:
+    """Normalize a request's classification and level to a precomputed tier.
+    
+    Unrecognized levels are treated as strict.
+    """
+    if classification not in SENSITIVITY_TIERS:
+        classification = ""
+    if redaction_level not in REDACTION_LEVELS:
+        redaction_level = "strict"
+    return classification, redaction_level
 
 class RedactionRequest(BaseModel):
     text: str
@@ -36,40 +345,435 @@ class RedactionResponse(BaseModel):
     redacted_text: str
     redaction_count: int
 
-class RedactionPattern(BaseModel):
+@dataclass(slots=True)
+class RedactionPattern:
+    """A redaction rule; only built internally, so it skips model validation."""
     id: str
     type: str
     regex: str
     replacement: str
     sensitivity: str  # low, medium, high, critical
+    # Set by compile_patterns
+    compiled: Any = None
+    engine: str = ""
+    # The regex on re, or None if re cannot read it the way RE2 does
+    stdlib: Any = None
+    required_literals: Tuple[str, ...] = ()
+    requires_digit: bool = False
+    max_len: int = 0
+    # SENSITIVITY_RANK of the sensitivity; unknown levels rank lowest
+    sens_rank: int = 0
+
+def stdlib_form(pattern: RedactionPattern) -> RedactionPattern:
+    """The pattern compiled on re, or pattern itself if it is already or cannot be."""
+    if pattern.engine == "re" or pattern.stdlib is None:
+        return pattern
+    return dataclass_replace(pattern, compiled=pattern.stdlib, engine="re")
+
+@dataclass(slots=True)
+class RedactionTier:
+    """The patterns applied for one classification and redaction level."""
+    patterns: List[RedactionPattern]
+    # Patterns keyed by their group name in the combined regex
+    by_group: Dict[str, RedactionPattern]
+    # Single alternation of the patterns on the preferred engine; None if
+    # there are none or it could not be compiled
+    combined: Optional[Any]
+    # Patterns not in the combined regex, whose matches are merged with it
+    separate: List[RedactionPattern]
+    # The alternation on re over bytes, with ASCII-only classes; only built
+    # for tiers on re when it covers every pattern of the tier
+    combined_bytes: Optional[Any]
+    bytes_replacements: Dict[str, bytes]
+    # Characters a stream carries past the text it emits: twice the longest
+    # match, so matches near the end of a piece and the context of \b and
+    # lookbehinds at its start are both seen whole
+    stream_tail: int = 0
+    # The same patterns on re, for text RE2 would match differently; None
+    # when this tier already runs on re
+    stdlib: Optional["RedactionTier"] = None
+
+@dataclass(frozen=True, slots=True)
+class PatternSnapshot:
+    """One load of compiled patterns and everything derived from them.
+    
+    Built in full before it is published with a single assignment; requests
+    read it once, so they never see parts of two different loads.
+    """
+    patterns: List[RedactionPattern]
+    by_id: Dict[str, RedactionPattern]
+    buckets: Dict[str, List[RedactionPattern]]
+    tiers: Dict[Tuple[str, str], RedactionTier]
+    # The patterns as run on text RE2 would match differently
+    stdlib_patterns: List[RedactionPattern]
+    # Hyperscan database, the pattern id of each of its expressions, and
+    # the ids it cannot rule out
+    hs_db: Optional[Any]
+    hs_ids: List[str]
+    hs_unfiltered: Set[str]
+    # Bumped on every load so cached results of older patterns are never served
+    version: int
 
 class RedactionService:
     def __init__(self):
-        self.patterns: List[RedactionPattern] = []
+        self._snapshot: Optional[PatternSnapshot] = None
+        # Reloads may run concurrently on the executor
+        self._load_lock = threading.Lock()
+        # Hyperscan scratch space cannot be shared by concurrent scans
+        self._hs_local = threading.local()
+        self._cache = ResponseCache()
         self.load_patterns()
     
+    @property
+    def patterns(self) -> List[RedactionPattern]:
+        """The patterns of the current load."""
+        return self._snapshot.patterns
+    
     def load_patterns(self):
-        """Load PII patterns from YAML file."""
+        """Load PII patterns from YAML file and publish them once compiled."""
+        with self._load_lock:
+            self._snapshot = self.compile_patterns(self.read_patterns())
+    
+    def read_patterns(self) -> List[RedactionPattern]:
+        """Read patterns from the YAML file, or the defaults if it is unusable."""
         try:
             if PII_PATTERNS_PATH.exists():
-                with open(PII_PATTERNS_PATH, 'r') as f:
-                    data = yaml.safe_load(f)
-                    for pattern_data in data.get('patterns', []):
-                        pattern = RedactionPattern(
-                            id=pattern_data['id'],
-                            type=pattern_data.get('type', 'pii'),
-                            regex=pattern_data['regex'],
-                            replacement=pattern_data.get('replacement', '[REDACTED]'),
-                            sensitivity=pattern_data.get('sensitivity', 'medium')
-                        )
-                        self.patterns.append(pattern)
-                logger.info(f"Loaded {len(self.patterns)} redaction patterns")
-            else:
-                logger.warning(f"Patterns file not found: {PII_PATTERNS_PATH}")
-                self.patterns = self.get_default_patterns()
+                patterns = []
+                data = read_patterns_file()
+                for pattern_data in data.get('patterns', []):
+                    if 'id' not in pattern_data or 'regex' not in pattern_data:
+                        logger.error(f"Skipping pattern without id or regex: {pattern_data}")
+                        continue
+                    pattern = RedactionPattern(
+                        id=pattern_data['id'],
+                        type=pattern_data.get('type', 'pii'),
+                        regex=pattern_data['regex'],
+                        replacement=pattern_data.get('replacement', '[REDACTED]'),
+                        sensitivity=pattern_data.get('sensitivity', 'medium')
+                    )
+                    patterns.append(pattern)
+                logger.info(f"Loaded {len(patterns)} redaction patterns")
+                return patterns
+            logger.warning(f"Patterns file not found: {PII_PATTERNS_PATH}")
         except Exception as e:
             logger.error(f"Failed to load patterns: {e}")
-            self.patterns = self.get_default_patterns()
+        return self.get_default_patterns()
+    
+    def compile_patterns(self, patterns: List[RedactionPattern]) -> PatternSnapshot:
+        """Compile every pattern once so requests only run matches.
+        
+        Patterns are validated here so the request path needs no checks:
+        duplicate ids and regexes that do not compile are logged and dropped.
+        """
+        valid: List[RedactionPattern] = []
+        seen_ids: Set[str] = set()
+        for pattern in patterns:
+            if pattern.id in seen_ids:
+                logger.error(f"Duplicate pattern id {pattern.id}, keeping the first")
+                continue
+            try:
+                pattern.compiled, pattern.engine = compile_regex(pattern.regex)
+            except re.error as e:
+                logger.error(f"Invalid regex for pattern {pattern.id}: {e}")
+                continue
+            if re2 is not None and pattern.engine == "re":
+                logger.info(f"Pattern {pattern.id} is not supported by RE2, using re")
+            pattern.stdlib = (
+                pattern.compiled if pattern.engine == "re" else compile_stdlib(pattern.regex)
+            )
+            if pattern.sensitivity not in SENSITIVITY_RANK:
+                logger.warning(
+                    f"Pattern {pattern.id} has unknown sensitivity {pattern.sensitivity!r}; "
+                    f"it is only applied when all patterns are"
+                )
+            pattern.sens_rank = SENSITIVITY_RANK.get(pattern.sensitivity, 0)
+            # The features and length come from re's parser, so they only hold
+            # when re reads the regex the way RE2 does; [[:digit:]] is a set
+            # to RE2 but a literal "]" after a set to re
+            if pattern.stdlib is not None:
+                pattern.required_literals, pattern.requires_digit = required_features(pattern.regex)
+                pattern.max_len = max_match_len(pattern.regex)
+            else:
+                pattern.max_len = STREAM_MAX_MATCH_LEN
+            if pattern.max_len == STREAM_MAX_MATCH_LEN:
+                logger.info(
+                    f"Pattern {pattern.id} has no bounded match length, streamed "
+                    f"redaction assumes at most {STREAM_MAX_MATCH_LEN} characters"
+                )
+            seen_ids.add(pattern.id)
+            valid.append(pattern)
+        hs_db, hs_ids, hs_unfiltered = self.build_prefilter(valid)
+        buckets = {
+            name: [p for p in valid if p.sensitivity in sensitivities]
+            for name, sensitivities in SENSITIVITY_BUCKETS.items()
+        }
+        buckets["all"] = valid
+        
+        engine = "re2" if re2 is not None else "re"
+        tiers = {
+            (classification, level): self.build_tier(buckets[bucket], engine)
+            for classification, levels in SENSITIVITY_TIERS.items()
+            for level, bucket in levels.items()
+        }
+        return PatternSnapshot(
+            patterns=valid,
+            by_id={pattern.id: pattern for pattern in valid},
+            buckets=buckets,
+            tiers=tiers,
+            stdlib_patterns=[stdlib_form(pattern) for pattern in valid],
+            hs_db=hs_db,
+            hs_ids=hs_ids,
+            hs_unfiltered=hs_unfiltered,
+            version=self._snapshot.version + 1 if self._snapshot else 1
+        )
+    
+    def build_prefilter(
+        self,
+        patterns: List[RedactionPattern]
+    ) -> Tuple[Optional[Any], List[str], Set[str]]:
+        """Compile a Hyperscan database reporting which patterns occur in a text.
+        
+        Returns the database, the pattern id for each database index, and
+        the ids Hyperscan cannot handle, which must always be run.
+        """
+        if hyperscan is None or not patterns:
+            return None, [], set()
+        
+        expressions: List[bytes] = []
+        flags: List[int] = []
+        ids: List[str] = []
+        unfiltered: Set[str] = set()
+        for pattern in patterns:
+            # Non-ASCII patterns may case-fold differently from re
+            if pattern.regex.isascii():
+                expression = pattern.regex.encode()
+                for mode in HS_MODES:
+                    try:
+                        hyperscan.Database().compile(
+                            expressions=[expression], ids=[0], elements=1, flags=[mode]
+                        )
+                    except hyperscan.error:
+                        continue
+                    expressions.append(expression)
+                    flags.append(mode)
+                    ids.append(pattern.id)
+                    break
+                else:
+                    unfiltered.add(pattern.id)
+            else:
+                unfiltered.add(pattern.id)
+        
+        if not ids:
+            return None, [], unfiltered
+        database = hyperscan.Database()
+        database.compile(
+            expressions=expressions, ids=list(range(len(ids))), elements=len(ids), flags=flags
+        )
+        return database, ids, unfiltered
+    
+    def prefilter(self, text: str, snapshot: PatternSnapshot) -> Set[str]:
+        """Return the ids of patterns that may match text.
+        
+        Hyperscan is used when available, but it only agrees with re's
+        Unicode character classes on ASCII text without the separator
+        controls in HS_MISMATCHED. Otherwise patterns are ruled out by the
+        literals and digits they require.
+        """
+        if snapshot.hs_db is None or not text.isascii() or HS_MISMATCHED.search(text):
+            candidates = set()
+            has_digit = None
+            for pattern in snapshot.patterns:
+                if not all(literal in text for literal in pattern.required_literals):
+                    continue
+                if pattern.requires_digit:
+                    if has_digit is None:
+                        has_digit = DIGIT.search(text) is not None
+                    if not has_digit:
+                        continue
+                candidates.add(pattern.id)
+            return candidates
+        
+        return self.scan_prefilter(text.encode(), snapshot)
+    
+    def scan_prefilter(self, data: bytes, snapshot: PatternSnapshot) -> Set[str]:
+        """Return the ids of patterns Hyperscan cannot rule out for ASCII data."""
+        database = snapshot.hs_db
+        candidates = set(snapshot.hs_unfiltered)
+        ids = snapshot.hs_ids
+        
+        # Each thread keeps its own scratch for the current database
+        scratch = getattr(self._hs_local, "scratch", None)
+        if scratch is None or self._hs_local.database is not database:
+            scratch = hyperscan.Scratch(database)
+            self._hs_local.scratch = scratch
+            self._hs_local.database = database
+        
+        def on_match(index: int, start: int, end: int, flags: int, context: Any):
+            candidates.add(ids[index])
+        
+        database.scan(data, match_event_handler=on_match, scratch=scratch)
+        return candidates
+    
+    def map_patterns(
+        self,
+        func: Callable[[Any], Any],
+        items: List[Any],
+        text: str
+    ) -> List[Any]:
+        """Apply func to each pattern or match source, on the pattern pool for large texts."""
+        if PATTERN_POOL is None or len(text) <= PARALLEL_SCAN_MIN_LEN or len(items) < 2:
+            return [func(item) for item in items]
+        return list(PATTERN_POOL.map(func, items))
+    
+    def merged_matches(
+        self,
+        text: str,
+        tier: RedactionTier,
+        candidates: Set[str],
+        pos: int = 0
+    ) -> Iterator[Tuple[int, int, RedactionPattern]]:
+        """Yield the matches of a tier's candidate patterns to redact, in order.
+        
+        Matches are taken from the original text left to right as (start,
+        end, pattern). Where matches overlap, the one starting first wins,
+        and among matches starting at the same offset the most sensitive
+        pattern wins; a pattern whose match was overlapped is searched again
+        after the accepted one. The tier's combined regex takes part as one
+        more source, whose matching group names the pattern.
+        
+        Each source's matches come from one finditer sweep, restarted only
+        in the gap after an accepted match that overlapped it. A fresh search
+        costs a full pass over the text on RE2, which encodes it every time.
+        """
+        orders = {pattern.id: order for order, pattern in enumerate(tier.patterns)}
+        sources: List[Tuple[Any, Any]] = [
+            (pattern.compiled, pattern) for pattern in tier.separate if pattern.id in candidates
+        ]
+        if tier.combined is not None and any(p.id in candidates for p in tier.by_group.values()):
+            sources.append((tier.combined, tier.by_group))
+        
+        def candidate(index: int, found: Any) -> Tuple[int, int, int, int, int, RedactionPattern]:
+            owner = sources[index][1]
+            pattern = owner[found.lastgroup] if isinstance(owner, dict) else owner
+            return found.start(), -pattern.sens_rank, orders[pattern.id], found.end(), index, pattern
+        
+        sweeps = [compiled.finditer(text, pos) for compiled, _ in sources]
+        first_matches = self.map_patterns(
+            lambda index: next(sweeps[index], None), list(range(len(sources))), text
+        )
+        # Next candidate match of each source, ordered by (start, -rank, order)
+        heap = [candidate(index, found) for index, found in enumerate(first_matches) if found]
+        heapq.heapify(heap)
+        
+        cursor = pos
+        while heap:
+            start, _, _, end, index, pattern = heapq.heappop(heap)
+            if start < cursor:
+                sweeps[index] = sources[index][0].finditer(text, cursor)
+            elif end == start:
+                # Empty matches redact nothing
+                sweeps[index] = sources[index][0].finditer(text, start + 1)
+            else:
+                yield start, end, pattern
+                cursor = end
+            
+            found = next(sweeps[index], None)
+            if found:
+                heapq.heappush(heap, candidate(index, found))
+    
+    def _apply_all(
+        self,
+        text: str,
+        tier: RedactionTier,
+        candidates: Set[str]
+    ) -> Tuple[str, List[str], int]:
+        """Redact the merged matches of a tier while building the output once.
+        
+        Returns the redacted text, the ids of patterns that matched and the
+        number of redactions.
+        """
+        parts: List[str] = []
+        matched: Set[str] = set()
+        cursor = 0
+        for start, end, pattern in self.merged_matches(text, tier, candidates):
+            parts.append(text[cursor:start])
+            parts.append(pattern.replacement)
+            matched.add(pattern.id)
+            cursor = end
+        parts.append(text[cursor:])
+        
+        patterns_matched = [pattern.id for pattern in tier.patterns if pattern.id in matched]
+        return "".join(parts), patterns_matched, len(parts) // 2
+    
+    def _apply_one(self, text: str, pattern: RedactionPattern) -> Tuple[str, List[str], int]:
+        """Redact the matches of a single pattern, which cannot overlap.
+        
+        One sub() sweep replaces the match merge; the replacement goes
+        through a callable so it is used literally, not as a template.
+        """
+        count = 0
+        
+        def replace(found: Any) -> str:
+            nonlocal count
+            if found.end() == found.start():
+                return ""
+            count += 1
+            return pattern.replacement
+        
+        redacted_text = pattern.compiled.sub(replace, text)
+        return redacted_text, [pattern.id] if count else [], count
+    
+    def build_tier(self, patterns: List[RedactionPattern], engine: str) -> RedactionTier:
+        """Fuse a tier's patterns into one regex so text is scanned once.
+        
+        Only patterns compiled on engine are fused, so the alternation runs
+        on RE2 whenever RE2 is installed; the others, such as patterns with
+        lookarounds, are run separately and merged with it. An RE2 tier
+        also gets a twin on re for text RE2 would match differently.
+        Each fused pattern becomes a named group; group names are positional
+        so they cannot collide with pattern ids or groups inside the
+        patterns. More sensitive patterns come first in the alternation, so
+        they win matches that start at the same offset.
+        """
+        fused = [pattern for pattern in patterns if pattern.engine == engine]
+        by_group = {f"p{index}": pattern for index, pattern in enumerate(fused)}
+        combined = None
+        combined_bytes = None
+        if fused:
+            alternatives = sorted(by_group.items(), key=lambda item: -item[1].sens_rank)
+            alternation = "|".join(f"(?P<{group}>{pattern.regex})" for group, pattern in alternatives)
+            try:
+                combined = compile_on(alternation, engine)
+            except (re.error, ValueError) as e:
+                logger.warning(f"Could not combine patterns, applying them one by one: {e}")
+            # Non-ASCII characters in a bytes regex would match single bytes
+            # on re; the bytes form is only used when it covers the whole tier
+            if (
+                engine == "re" and combined is not None
+                and len(fused) == len(patterns) and alternation.isascii()
+            ):
+                try:
+                    combined_bytes = compile_on(alternation.encode(), engine)
+                except (re.error, ValueError):
+                    pass
+        if combined is None:
+            by_group = {}
+        fused_ids = {pattern.id for pattern in by_group.values()}
+        return RedactionTier(
+            patterns=patterns,
+            by_group=by_group,
+            combined=combined,
+            separate=[pattern for pattern in patterns if pattern.id not in fused_ids],
+            combined_bytes=combined_bytes,
+            bytes_replacements={
+                group: pattern.replacement.encode() for group, pattern in by_group.items()
+            },
+            stream_tail=2 * max((pattern.max_len for pattern in patterns), default=0),
+            stdlib=(
+                self.build_tier([stdlib_form(pattern) for pattern in patterns], "re")
+                if engine == "re2" else None
+            )
+        )
     
     def get_default_patterns(self) -> List[RedactionPattern]:
         """Return default redaction patterns."""
@@ -98,7 +802,7 @@ class RedactionService:
             RedactionPattern(
                 id="pan",
                 type="financial",
-                regex=r"\b(?:\d[ -]*?){13,19}\b",
+                regex=r"\b\d(?:[ -]?\d){12,18}?\b",
                 replacement="****-****-****-XXXX",
                 sensitivity="critical"
             ),
@@ -134,29 +838,17 @@ class RedactionService:
     ) -> RedactionResponse:
         """Apply redaction based on classification and level."""
         original_length = len(text)
-        redacted_text = text
-        patterns_matched: List[str] = []
-        redaction_count = 0
         
         # Determine which patterns to apply based on classification
-        patterns_to_apply = self.get_patterns_for_classification(
-            classification,
-            redaction_level
-        )
-        
-        # Apply each pattern
-        for pattern in patterns_to_apply:
-            try:
-                compiled_pattern = re.compile(pattern.regex, re.IGNORECASE)
-                matches = compiled_pattern.findall(redacted_text)
-                
-                if matches:
-                    patterns_matched.append(pattern.id)
-                    redaction_count += len(matches)
-                    redacted_text = compiled_pattern.sub(pattern.replacement, redacted_text)
-                    
-            except re.error as e:
-                logger.error(f"Invalid regex for pattern {pattern.id}: {e}")
+        snapshot = self._snapshot
+        key = tier_key(classification, redaction_level)
+        # Texts too large to cache get no key and are always redacted
+        cache_key = content_hash(text, key, snapshot.version)
+        cached = self._cache.get(cache_key)
+        if cached is None:
+            cached = self.apply_tier(text, snapshot.tiers[key], snapshot)
+            self._cache.put(cache_key, cached)
+        redacted_text, patterns_matched, redaction_count = cached
         
         redacted_length = len(redacted_text)
         
@@ -169,73 +861,152 @@ class RedactionService:
             redaction_count=redaction_count
         )
     
+    def apply_tier(
+        self,
+        text: str,
+        tier: RedactionTier,
+        snapshot: PatternSnapshot
+    ) -> Tuple[str, List[str], int]:
+        """Redact text with a tier's patterns from snapshot.
+        
+        Returns the redacted text, the ids of patterns that matched and the
+        number of redactions.
+        """
+        if tier.stdlib is not None and needs_stdlib(text):
+            tier = tier.stdlib
+        redacted_text = text
+        patterns_matched: List[str] = []
+        redaction_count = 0
+        candidates = self.prefilter(text, snapshot)
+        
+        separate = [p for p in tier.separate if p.id in candidates]
+        fused = any(p.id in candidates for p in tier.by_group.values())
+        
+        if not separate and not fused:
+            # The prefilter ruled out every pattern, so the text is unchanged
+            pass
+        elif not separate:
+            # One pass over the text; the matching group names the pattern
+            counts: Dict[str, int] = {}
+            
+            def replace(match: Any) -> str:
+                group = match.lastgroup
+                counts[group] = counts.get(group, 0) + 1
+                return tier.by_group[group].replacement
+            
+            redacted_text = tier.combined.sub(replace, text)
+            patterns_matched = [
+                pattern.id for group, pattern in tier.by_group.items() if group in counts
+            ]
+            redaction_count = sum(counts.values())
+        elif not fused and len(separate) == 1:
+            redacted_text, patterns_matched, redaction_count = self._apply_one(text, separate[0])
+        else:
+            redacted_text, patterns_matched, redaction_count = self._apply_all(
+                text, tier, candidates
+            )
+        
+        return redacted_text, patterns_matched, redaction_count
+    
+    def redact_bytes(
+        self,
+        data: bytes,
+        classification: str,
+        redaction_level: str
+    ) -> RedactionResponse:
+        """Redact UTF-8 encoded text without decoding it first.
+        
+        Matching uses the bytes form of the tier's regex on re, whose \\d,
+        \\w, \\s, \\b and case folding only cover ASCII. It is only used for
+        ASCII bodies without the separators in BYTES_MISMATCHED, where it
+        matches exactly like redact_text and bytes are characters. Other
+        bodies, and tiers without a bytes regex, go through redact_text.
+        """
+        snapshot = self._snapshot
+        tier = snapshot.tiers[tier_key(classification, redaction_level)]
+        if tier.stdlib is not None:
+            tier = tier.stdlib
+        if tier.combined_bytes is None or not data.isascii() or BYTES_MISMATCHED.search(data):
+            return self.redact_text(data.decode(), classification, redaction_level, {})
+        
+        redacted = data
+        counts: Dict[str, int] = {}
+        candidates = self.scan_prefilter(data, snapshot) if snapshot.hs_db is not None else None
+        if candidates is None or any(p.id in candidates for p in tier.patterns):
+            def replace(match: Any) -> bytes:
+                group = match.lastgroup
+                counts[group] = counts.get(group, 0) + 1
+                return tier.bytes_replacements[group]
+            
+            redacted = tier.combined_bytes.sub(replace, data)
+        
+        # Replacements may be non-ASCII, so the output is measured decoded
+        redacted_text = redacted.decode()
+        patterns_matched = [
+            pattern.id for group, pattern in tier.by_group.items() if group in counts
+        ]
+        return RedactionResponse(
+            original_length=len(data),
+            redacted_length=len(redacted_text),
+            redaction_applied=len(patterns_matched) > 0,
+            patterns_matched=patterns_matched,
+            redacted_text=redacted_text,
+            redaction_count=sum(counts.values())
+        )
+    
+    def stream_redactor(self, classification: str, redaction_level: str) -> "StreamRedactor":
+        """Start redacting a text that arrives in pieces."""
+        snapshot = self._snapshot
+        return StreamRedactor(self, snapshot, snapshot.tiers[tier_key(classification, redaction_level)])
+    
     def get_patterns_for_classification(
         self,
         classification: str,
         redaction_level: str
     ) -> List[RedactionPattern]:
         """Get redaction patterns based on classification and level."""
-        # Public documents: minimal redaction
-        if classification == "Public":
-            if redaction_level == "minimal":
-                return []
-            elif redaction_level == "standard":
-                return [p for p in self.patterns if p.sensitivity in ["critical"]]
-            else:  # strict
-                return [p for p in self.patterns if p.sensitivity in ["critical", "high"]]
-        
-        # Internal documents: standard redaction
-        elif classification == "Internal":
-            if redaction_level == "minimal":
-                return [p for p in self.patterns if p.sensitivity in ["critical"]]
-            elif redaction_level == "standard":
-                return [p for p in self.patterns if p.sensitivity in ["critical", "high"]]
-            else:  # strict
-                return [p for p in self.patterns if p.sensitivity in ["critical", "high", "medium"]]
-        
-        # Confidential documents: aggressive redaction
-        elif classification == "Confidential":
-            if redaction_level == "minimal":
-                return [p for p in self.patterns if p.sensitivity in ["critical", "high"]]
-            elif redaction_level == "standard":
-                return [p for p in self.patterns if p.sensitivity in ["critical", "high", "medium"]]
-            else:  # strict
-                return self.patterns  # All patterns
-        
-        # Regulated documents: maximum redaction
-        elif classification == "Regulated":
-            # Always use all patterns for regulated content
-            return self.patterns
+        classification, redaction_level = tier_key(classification, redaction_level)
+        return self._snapshot.buckets[SENSITIVITY_TIERS[classification][redaction_level]]
+    
+    def detect_pii(self, text: str, include_matches: bool = False) -> Dict[str, Any]:
+        """Detect PII without redaction (for analysis).
         
+        Patterns map to their match counts, or to the matches themselves
+        with include_matches; match lists can be as large as the text.
+        """
+        detections: Dict[str, Any] = {}
+        counts: Dict[str, int] = {}
+        
+        snapshot = self._snapshot
+        patterns = snapshot.stdlib_patterns if needs_stdlib(text) else snapshot.patterns
+        candidates = self.prefilter(text, snapshot)
+        to_scan = [p for p in patterns if p.id in candidates]
+        if include_matches:
+            results = self.map_patterns(lambda p: p.compiled.findall(text), to_scan, text)
         else:
-            # Unknown classification: use standard redaction
-            return [p for p in self.patterns if p.sensitivity in ["critical", "high"]]
-    
-    def detect_pii(self, text: str) -> Dict[str, Any]:
-        """Detect PII without redaction (for analysis)."""
-        detections: Dict[str, List[str]] = {}
-        total_count = 0
+            results = self.map_patterns(
+                lambda p: sum(1 for _ in p.compiled.finditer(text)), to_scan, text
+            )
         
-        for pattern in self.patterns:
-            try:
-                compiled_pattern = re.compile(pattern.regex, re.IGNORECASE)
-                matches = compiled_pattern.findall(text)
-                
-                if matches:
-                    detections[pattern.id] = matches
-                    total_count += len(matches)
-                    
-            except re.error as e:
-                logger.error(f"Invalid regex for pattern {pattern.id}: {e}")
+        for pattern, result in zip(to_scan, results):
+            count = len(result) if include_matches else result
+            if count:
+                detections[pattern.id] = result
+                counts[pattern.id] = count
+        total_count = sum(counts.values())
         
         return {
             "pii_detected": total_count > 0,
             "total_count": total_count,
             "patterns": detections,
-            "sensitivity_breakdown": self.categorize_by_sensitivity(detections)
+            "sensitivity_breakdown": self.categorize_by_sensitivity(counts, snapshot)
         }
     
-    def categorize_by_sensitivity(self, detections: Dict[str, List[str]]) -> Dict[str, int]:
+    def categorize_by_sensitivity(
+        self,
+        counts: Dict[str, int],
+        snapshot: PatternSnapshot
+    ) -> Dict[str, int]:
         """Categorize detections by sensitivity level."""
         breakdown = {
             "critical": 0,
@@ -244,21 +1015,108 @@ class RedactionService:
             "low": 0
         }
         
-        for pattern_id in detections:
-            pattern = next((p for p in self.patterns if p.id == pattern_id), None)
-            if pattern:
-                breakdown[pattern.sensitivity] += len(detections[pattern_id])
+        for pattern_id, count in counts.items():
+            sensitivity = snapshot.by_id[pattern_id].sensitivity
+            if sensitivity in breakdown:
+                breakdown[sensitivity] += count
         
         return breakdown
 
-# Initialize service
-redaction_service = RedactionService()
+class StreamRedactor:
+    """Redacts a text fed in pieces without holding all of it in memory.
+    
+    Each piece is scanned together with the carried tail of the previous
+    one. Matches starting before the tier's last stream_tail characters are
+    final and everything up to that point is emitted; the rest is carried
+    along with stream_tail characters of context for lookbehinds and \\b.
+    """
+    
+    def __init__(self, service: RedactionService, snapshot: PatternSnapshot, tier: RedactionTier):
+        self.service = service
+        self.snapshot = snapshot
+        self.tier = tier
+        self.buffer = ""
+        # Start of the text in buffer that has not been emitted
+        self.cursor = 0
+        self.counts: Dict[str, int] = {}
+        self.patterns_matched: List[str] = []
+        self.redaction_count = 0
+    
+    def feed(self, text: str) -> str:
+        """Add text and return the redacted text that is now final."""
+        self.buffer += text
+        return self._scan(len(self.buffer) - self.tier.stream_tail)
+    
+    def finish(self, text: str = "") -> str:
+        """Add the last of the text and return the rest of the redacted text."""
+        self.buffer += text
+        redacted_text = self._scan(len(self.buffer))
+        self.patterns_matched = [
+            pattern.id for pattern in self.tier.patterns if pattern.id in self.counts
+        ]
+        self.redaction_count = sum(self.counts.values())
+        return redacted_text
+    
+    def _scan(self, boundary: int) -> str:
+        """Redact the buffer up to boundary and carry the rest."""
+        buffer, cursor = self.buffer, self.cursor
+        tier = self.tier
+        if tier.stdlib is not None and needs_stdlib(buffer):
+            tier = tier.stdlib
+        parts: List[str] = []
+        candidates = self.service.prefilter(buffer, self.snapshot)
+        for start, end, pattern in self.service.merged_matches(buffer, tier, candidates, cursor):
+            if start >= boundary:
+                break
+            self.counts[pattern.id] = self.counts.get(pattern.id, 0) + 1
+            parts.append(buffer[cursor:start])
+            parts.append(pattern.replacement)
+            cursor = end
+        if boundary > cursor:
+            parts.append(buffer[cursor:boundary])
+            cursor = boundary
+        
+        keep = max(0, cursor - self.tier.stream_tail)
+        self.buffer = buffer[keep:]
+        self.cursor = cursor - keep
+        return "".join(parts)
+
+# The service is created after startup, off the event loop, so the process
+# answers /health while patterns are still being compiled
+redaction_service: Optional[RedactionService] = None
+_ready = False
+# Set when loading fails; the service stays unready until restarted
+_init_error: Optional[str] = None
+# The background load started by lifespan
+_init_future: Optional[asyncio.Future] = None
+
+def init_redaction_service():
+    """Load and compile patterns, then mark the service ready."""
+    global redaction_service, _ready, _init_error
+    try:
+        redaction_service = RedactionService()
+        _ready = True
+        logger.info("Redaction service ready")
+    except Exception as e:
+        _init_error = str(e)
+        logger.error(f"Failed to initialize redaction service: {e}")
+
+def get_service() -> RedactionService:
+    """Return the redaction service, or fail with 503 while it is loading."""
+    if not _ready:
+        if _init_error is not None:
+            raise HTTPException(status_code=503, detail="Redaction service failed to initialize")
+        raise HTTPException(status_code=503, detail="Redaction patterns are still loading")
+    return redaction_service
 
 @app.post("/redact", response_model=RedactionResponse)
 async def redact_text(request: RedactionRequest):
     """Redact sensitive information from text."""
+    redaction_service = get_service()
     try:
-        result = redaction_service.redact_text(
+        result = await asyncio.get_running_loop().run_in_executor(
+            _EXECUTOR,
+            redaction_service.redact_text,
             request.text,
             request.classification,
             request.redaction_level,
@@ -278,11 +1136,111 @@ async def redact_text(request: RedactionRequest):
         logger.error(f"Redaction error: {e}")
         raise HTTPException(status_code=500, detail=f"Redaction failed: {str(e)}")
 
+@app.post("/redact-bytes", response_model=RedactionResponse)
+async def redact_bytes(
+    request: Request,
+    classification: str = "Internal",
+    redaction_level: str = "standard"
+):
+    """Redact a raw UTF-8 request body without decoding it up front.
+    
+    Classification and level are passed as query parameters.
+    """
+    redaction_service = get_service()
+    data = await request.body()
+    try:
+        result = await asyncio.get_running_loop().run_in_executor(
+            _EXECUTOR,
+            redaction_service.redact_bytes,
+            data,
+            classification,
+            redaction_level
+        )
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Request body is not valid UTF-8")
+    except Exception as e:
+        logger.error(f"Redaction error: {e}")
+        raise HTTPException(status_code=500, detail=f"Redaction failed: {str(e)}")
+    
+    logger.info(
+        f"Redaction (bytes): classification={classification}, "
+        f"level={redaction_level}, "
+        f"patterns={len(result.patterns_matched)}, "
+        f"count={result.redaction_count}"
+    )
+    return result
+
+class BodyStreamingResponse(StreamingResponse):
+    """A StreamingResponse whose iterator may still be reading the request body.
+    
+    StreamingResponse listens on receive() for a disconnect while it sends,
+    which would take body messages away from the iterator; here a disconnect
+    surfaces through the request stream instead.
+    """
+    
+    async def __call__(self, scope: Any, receive: Any, send: Any) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+@app.post("/redact-stream")
+async def redact_stream(
+    request: Request,
+    classification: str = "Internal",
+    redaction_level: str = "standard"
+):
+    """Redact a UTF-8 request body as it arrives and stream the result back.
+    
+    Classification and level are passed as query parameters. Invalid UTF-8
+    is replaced with U+FFFD, as errors cannot be reported once the response
+    has started.
+    """
+    stream = get_service().stream_redactor(classification, redaction_level)
+    
+    async def redacted_chunks():
+        loop = asyncio.get_running_loop()
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        pending = bytearray()
+        try:
+            async for chunk in request.stream():
+                pending += chunk
+                if len(pending) >= STREAM_CHUNK_SIZE:
+                    text = decoder.decode(bytes(pending))
+                    pending.clear()
+                    redacted = await loop.run_in_executor(_EXECUTOR, stream.feed, text)
+                    if redacted:
+                        yield redacted
+            yield await loop.run_in_executor(
+                _EXECUTOR, stream.finish, decoder.decode(bytes(pending), final=True)
+            )
+        except Exception as e:
+            logger.error(f"Redaction error: {e}")
+            raise
+        
+        logger.info(
+            f"Redaction (stream): classification={classification}, "
+            f"level={redaction_level}, "
+            f"patterns={len(stream.patterns_matched)}, "
+            f"count={stream.redaction_count}"
+        )
+    
+    return BodyStreamingResponse(redacted_chunks(), media_type="text/plain")
+
 @app.post("/detect")
-async def detect_pii(request: RedactionRequest):
-    """Detect PII without redacting."""
+async def detect_pii(request: RedactionRequest, include_matches: bool = False):
+    """Detect PII without redacting.
+    
+    Returns match counts per pattern; pass include_matches=true for the
+    matched text.
+    """
+    redaction_service = get_service()
     try:
-        result = redaction_service.detect_pii(request.text)
+        result = await asyncio.get_running_loop().run_in_executor(
+            _EXECUTOR,
+            redaction_service.detect_pii,
+            request.text,
+            include_matches
+        )
         logger.info(f"PII detection: found={result['total_count']} instances")
         return result
         
@@ -293,23 +1251,26 @@ async def detect_pii(request: RedactionRequest):
 @app.get("/patterns")
 async def get_patterns():
     """Get available redaction patterns."""
+    patterns = get_service().patterns
     return {
         "patterns": [
             {
                 "id": p.id,
                 "type": p.type,
-                "sensitivity": p.sensitivity
+                "sensitivity": p.sensitivity,
+                "engine": p.engine
             }
-            for p in redaction_service.patterns
+            for p in patterns
         ],
-        "total": len(redaction_service.patterns)
+        "total": len(patterns)
     }
 
 @app.post("/patterns/reload")
 async def reload_patterns():
     """Reload patterns from file."""
+    redaction_service = get_service()
     try:
-        redaction_service.load_patterns()
+        await asyncio.get_running_loop().run_in_executor(_EXECUTOR, redaction_service.load_patterns)
         return {
             "message": "Patterns reloaded",
             "count": len(redaction_service.patterns)
@@ -319,7 +1280,19 @@ async def reload_patterns():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint."""
+    """Health check endpoint; 503 until patterns are loaded."""
+    if _init_error is not None:
+        return JSONResponse(status_code=503, content={
+            "status": "unhealthy",
+            "service": "redactor",
+            "error": _init_error
+        })
+    if not _ready:
+        return JSONResponse(status_code=503, content={
+            "status": "starting",
+            "service": "redactor",
+            "patterns_loaded": 0
+        })
     return {
         "status": "healthy",
         "service": "redactor",
@@ -328,5 +1301,10 @@ async def health_check():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=3007)
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=3007,
+        workers=int(os.environ.get("UVICORN_WORKERS", "1"))
+    )
 
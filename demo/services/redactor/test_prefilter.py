@@ -0,0 +1,104 @@
+"""
+Prefilter Tests
+
+The prefilter decides which patterns are skipped for a text, so it must
+never rule out a pattern that would match: a wrong answer leaks PII.
+These check it against re (and the engine each pattern is compiled on)
+for the shipped and default patterns, on both the Hyperscan and the
+literal path.
+"""
+
+import re
+import dataclasses
+
+import pytest
+
+import main
+
+@pytest.fixture(scope="module", params=["shipped", "default"])
+def snapshot(request, service):
+    if request.param == "shipped":
+        snapshot = service._snapshot
+        assert len(snapshot.patterns) == len(service.read_patterns())
+        return snapshot
+    return service.compile_patterns(service.get_default_patterns())
+
+def missed_patterns(snapshot, text, candidates):
+    """Ids of patterns that match text but are not among candidates."""
+    missed = []
+    for pattern in snapshot.patterns:
+        if pattern.id in candidates:
+            continue
+        if re.search(pattern.regex, text, re.IGNORECASE) or pattern.compiled.search(text):
+            missed.append(pattern.id)
+    return missed
+
+def test_examples_match(snapshot, corpus):
+    # The corpus is only useful if it exercises the patterns
+    matched = {
+        pattern.id
+        for pattern in snapshot.patterns
+        for text in corpus
+        if re.search(pattern.regex, text, re.IGNORECASE)
+    }
+    assert matched == set(snapshot.by_id)
+
+def test_prefilter_never_excludes_a_match(service, snapshot, corpus):
+    for text in corpus:
+        assert missed_patterns(snapshot, text, service.prefilter(text, snapshot)) == [], repr(text)
+
+def test_literal_prefilter_never_excludes_a_match(service, snapshot, corpus):
+    literal_only = dataclasses.replace(snapshot, hs_db=None)
+    for text in corpus:
+        assert missed_patterns(snapshot, text, service.prefilter(text, literal_only)) == [], repr(text)
+
+@pytest.mark.skipif(main.hyperscan is None, reason="hyperscan is not installed")
+def test_hyperscan_prefilter_never_excludes_a_match(service, snapshot, corpus):
+    assert snapshot.hs_db is not None
+    texts = [text for text in corpus if text.isascii() and not main.HS_MISMATCHED.search(text)]
+    assert texts
+    for text in texts:
+        candidates = service.scan_prefilter(text.encode(), snapshot)
+        assert missed_patterns(snapshot, text, candidates) == [], repr(text)
+
+@pytest.mark.parametrize("regex, expected", [
+    (r"\d{3}-\d{2}", (("-",), True)),
+    (r"[0-9]+", ((), True)),
+    (r"[0-9a]", ((), False)),
+    (r"-?\d", ((), True)),
+    (r"\d*x", ((), False)),
+    (r"(?:1-|2-)x", (("-",), True)),
+    (r"(?:1-|x)", ((), False)),
+    (r"[^@]+@[^@]+\.com", ((".", "@"), False)),
+    (r"abc", ((), False)),
+    (r"é-", (("-",), False)),
+    (r"(", ((), False)),
+])
+def test_required_features(regex, expected):
+    assert main.required_features(regex) == expected
+
+@pytest.mark.parametrize("regex", [
+    r"\d{3}-\d{2}", r"(?:1-|2-)x", r"[^@]+@[^@]+\.com", r"(?:a|b)?-\d",
+])
+def test_required_features_hold_for_matches(regex, corpus):
+    literals, needs_digit = main.required_features(regex)
+    compiled = re.compile(regex, re.IGNORECASE)
+    for text in corpus:
+        if compiled.search(text):
+            assert all(literal in text for literal in literals), repr(text)
+            if needs_digit:
+                assert main.DIGIT.search(text), repr(text)
+
+@pytest.mark.skipif(main.re2 is None, reason="google-re2 is not installed")
+def test_re2_only_syntax_is_never_ruled_out(service):
+    posix_digits = main.RedactionPattern(
+        id="posix_digits", type="pii", regex=r"\b[[:digit:]]{9}\b",
+        replacement="[REDACTED]", sensitivity="critical"
+    )
+    snapshot = service.compile_patterns(service.read_patterns() + [posix_digits])
+    assert snapshot.by_id["posix_digits"].engine == "re2"
+    text = "café acct 123456789"
+    assert "posix_digits" in service.prefilter(text, snapshot)
+    tier = snapshot.tiers[("Regulated", "strict")]
+    redacted_text, patterns_matched, _ = service.apply_tier(text, tier, snapshot)
+    assert "123456789" not in redacted_text
@@ -0,0 +1,87 @@
+"""
+Redaction Tests
+"""
+
+import pytest
+
+import main
+
+# One tier per sensitivity bucket
+TIER_KEYS = [
+    ("Internal", "minimal"), ("Internal", "standard"), ("Internal", "strict"), ("Regulated", "strict"),
+]
+
+def redact(service, text, classification="Regulated", redaction_level="strict"):
+    return service.redact_text(text, classification, redaction_level, {})
+
+def test_card_number_stops_before_next_number(service):
+    result = redact(service, "Card 4111111111111111 123-45-6789")
+    assert result.redacted_text == "Card [REDACTED] [REDACTED]"
+    assert set(result.patterns_matched) == {"pan", "ssn"}
+
+def test_default_card_number_stops_before_next_number(service):
+    snapshot = service.compile_patterns(service.get_default_patterns())
+    redacted_text, patterns_matched, _ = service.apply_tier(
+        "Card 4111111111111111 123-45-6789", snapshot.tiers[("Regulated", "strict")], snapshot
+    )
+    by_id = snapshot.by_id
+    assert redacted_text == f"Card {by_id['pan'].replacement} {by_id['ssn'].replacement}"
+    assert set(patterns_matched) == {"pan", "ssn"}
+
+@pytest.fixture(scope="module")
+def re_snapshot(service):
+    """The shipped patterns compiled without RE2, so every regex runs on re."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(main, "re2", None)
+        return service.compile_patterns(service.read_patterns())
+
+@pytest.mark.parametrize("text", [
+    "card ４１１１ 1111 1111 1111",
+    "acct ١٢٣٤٥٦٧٨٩٠١",
+    "123\x0bMain Street",
+])
+def test_redacts_text_re2_reads_differently(service, text):
+    result = redact(service, text)
+    assert result.redaction_applied
+    assert not any(char.isdigit() for char in result.redacted_text)
+
+def test_redaction_matches_re(service, re_snapshot, corpus):
+    snapshot = service._snapshot
+    for key in TIER_KEYS:
+        for text in corpus:
+            expected = service.apply_tier(text, re_snapshot.tiers[key], re_snapshot)
+            assert service.apply_tier(text, snapshot.tiers[key], snapshot) == expected, (key, text)
+
+def test_detection_matches_re(service, re_snapshot, corpus):
+    detected = [service.detect_pii(text, include_matches=True) for text in corpus]
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(service, "_snapshot", re_snapshot)
+        expected = [service.detect_pii(text, include_matches=True) for text in corpus]
+    assert detected == expected
+
+@pytest.mark.parametrize("engine", ["preferred", "re"])
+def test_bytes_redaction_matches_text_redaction(service, re_snapshot, corpus, engine):
+    texts = corpus + ["123\xa0Main Street", "acct 12345678901\x1c", "x" * 100 + "123-45-6789"]
+    with pytest.MonkeyPatch.context() as mp:
+        if engine == "re":
+            mp.setattr(service, "_snapshot", re_snapshot)
+        expected = {
+            (key, text): redact(service, text, *key) for key in TIER_KEYS for text in texts
+        }
+        # Plain ASCII bodies must take the bytes path rather than decode
+        decoded = []
+        redact_text = service.redact_text
+        
+        def spy(text, *args):
+            decoded.append(text)
+            return redact_text(text, *args)
+        
+        mp.setattr(service, "redact_text", spy)
+        for key in TIER_KEYS:
+            if not service._snapshot.tiers[key].patterns:
+                continue
+            for text in texts:
+                decoded.clear()
+                assert service.redact_bytes(text.encode(), *key) == expected[key, text], (key, text)
+                if text.isascii() and not main.BYTES_MISMATCHED.search(text.encode()):
+                    assert decoded == [], (key, text)
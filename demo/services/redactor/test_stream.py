@@ -0,0 +1,72 @@
+"""
+Streamed Redaction Tests
+
+/redact-stream and the merged match path must redact exactly like the
+fused regex that /redact uses, however the text is split into pieces.
+"""
+
+import random
+
+import pytest
+
+import main
+from test_redaction import TIER_KEYS
+
+CHUNK_SIZES = [1, 7, 100, 4096]
+
+@pytest.fixture(scope="module", params=["shipped", "default"])
+def snapshot(request, service):
+    if request.param == "shipped":
+        return service._snapshot
+    return service.compile_patterns(service.get_default_patterns())
+
+@pytest.fixture(scope="module")
+def documents(corpus):
+    """Long texts joining corpus entries, some plain ASCII and some not."""
+    rng = random.Random(1234)
+    ascii_texts = [text for text in corpus if not main.needs_stdlib(text)]
+    documents = []
+    for texts in (ascii_texts, corpus):
+        for separator in (" ", "\n", ""):
+            documents.append(separator.join(rng.sample(texts, 300)))
+    assert any(not main.needs_stdlib(document) for document in documents)
+    return documents
+
+def stream(service, snapshot, tier, text, chunk_size):
+    redactor = main.StreamRedactor(service, snapshot, tier)
+    parts = [redactor.feed(text[i:i + chunk_size]) for i in range(0, len(text), chunk_size)]
+    parts.append(redactor.finish())
+    return "".join(parts), redactor.patterns_matched, redactor.redaction_count
+
+def test_stream_tail_covers_the_longest_match(snapshot):
+    for tier in snapshot.tiers.values():
+        longest = max((pattern.max_len for pattern in tier.patterns), default=0)
+        assert tier.stream_tail == 2 * longest
+        assert tier.stream_tail <= 2 * main.STREAM_MAX_MATCH_LEN
+        if tier.stdlib is not None:
+            assert tier.stdlib.stream_tail == tier.stream_tail
+
+def test_lookarounds_count_toward_match_length():
+    assert main.max_match_len(r"\d{3}") == 3
+    assert main.max_match_len(r"(?<=acct )\d{3}(?!-\d)") == 3 + 5 + 2
+    assert main.max_match_len(r"\d+") == main.STREAM_MAX_MATCH_LEN
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_stream_matches_whole_text(service, snapshot, documents, chunk_size):
+    for key in TIER_KEYS:
+        tier = snapshot.tiers[key]
+        for document in documents:
+            expected = service.apply_tier(document, tier, snapshot)
+            assert stream(service, snapshot, tier, document, chunk_size) == expected, key
+
+def test_merged_matches_agree_with_fused_regex(service, snapshot, corpus, documents):
+    candidates = set(snapshot.by_id)
+    for key in TIER_KEYS:
+        tier = snapshot.tiers[key]
+        for text in corpus + documents:
+            expected = service.apply_tier(text, tier, snapshot)
+            applied = tier.stdlib if tier.stdlib is not None and main.needs_stdlib(text) else tier
+            assert service._apply_all(text, applied, candidates) == expected, (key, text)
+            if tier.stdlib is not None:
+                # The re twin agrees wherever RE2 is used
+                assert service.apply_tier(text, tier.stdlib, snapshot) == expected, (key, text)
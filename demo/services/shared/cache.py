@@ -0,0 +1,81 @@
+"""
+Shared Response Cache
+
+Repeated requests for identical content are served from memory. Services
+cache serialized JSON bodies where they can, which also skips FastAPI
+re-validating and re-encoding the response model.
+"""
+
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+RESPONSE_CACHE_SIZE = 4096
+RESPONSE_CACHE_TTL_SECONDS = 600
+# Only content up to this many characters is cached. Every entry may hold
+# results as large as its text, so larger texts would let a few requests
+# pin hundreds of megabytes
+RESPONSE_CACHE_MAX_TEXT_LEN = 16 * 1024
+
+class ResponseCache:
+    """Thread-safe in-memory LRU cache with a per-entry time-to-live.
+    
+    A None key, which content_hash returns for oversized content, is never
+    cached.
+    """
+    
+    def __init__(
+        self,
+        maxsize: int = RESPONSE_CACHE_SIZE,
+        ttl_seconds: float = RESPONSE_CACHE_TTL_SECONDS
+    ):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        # Some services serve requests from a thread pool
+        self._lock = threading.Lock()
+    
+    def get(self, key: Any) -> Any:
+        """Return the cached value for key, or None if missing or expired."""
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+    
+    def put(self, key: Any, value: Any):
+        """Store value under key, evicting the least recently used entry."""
+        if key is None:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+def content_hash(text: str, *extra: Any) -> Optional[bytes]:
+    """Hash request content, and any JSON-encodable extras, into a compact cache key.
+    
+    Returns None, which ResponseCache does not store, when text is longer
+    than RESPONSE_CACHE_MAX_TEXT_LEN.
+    """
+    if len(text) > RESPONSE_CACHE_MAX_TEXT_LEN:
+        return None
+    digest = hashlib.blake2b(text.encode(), digest_size=16)
+    for value in extra:
+        digest.update(json.dumps(value, sort_keys=True, default=str).encode())
+    return digest.digest()
@@ -0,0 +1,18 @@
+"""
+Shared Request Limits
+
+Size limits for services that scan request text with regexes.
+"""
+
+from fastapi import HTTPException
+
+# Largest text accepted per request; bounds worst-case regex scan time
+MAX_TEXT_LEN = 64 * 1024
+
+def check_text_length(text: str):
+    """Reject text longer than MAX_TEXT_LEN with 413 Payload Too Large."""
+    if len(text) > MAX_TEXT_LEN:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Text exceeds the {MAX_TEXT_LEN} character limit"
+        )
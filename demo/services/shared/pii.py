@@ -0,0 +1,137 @@
+"""
+Shared PII Matcher
+
+Built-in PII patterns compiled once per process into a single alternation,
+plus the YAML loader the services use for their configuration files.
+"""
+
+import re
+import threading
+import yaml
+from pathlib import Path
+from typing import Dict, Any, Tuple
+
+# Prefer the libyaml-backed loader when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
+# Hyperscan is optional; when installed it checks all patterns in one pass
+# so text without PII skips the regex
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+PATTERNS = {
+    'ssn': r'\b(?!000|666)[0-8][0-9]{2}-?(?!00)[0-9]{2}-?(?!0000)[0-9]{4}\b',
+    'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
+    'phone': r'\b(?:\(?([0-9]{3})\)?[-. ]?)?([0-9]{3})[-. ]?([0-9]{4})\b',
+    'credit_card': r'\b\d(?:[ -]?\d){12,18}?\b'
+}
+
+REPLACEMENTS = {
+    'ssn': 'XXX-XX-XXXX',
+    'email': '***@***.***',
+    'phone': '(XXX) XXX-XXXX',
+    'credit_card': '****-****-****-XXXX'
+}
+
+# All PII patterns as one alternation; the matching group name gives the type
+_UNION = re.compile(
+    "|".join(f"(?P<{pii_type}>{pattern})" for pii_type, pattern in PATTERNS.items()),
+    re.IGNORECASE
+)
+
+# ASCII characters re's str \s matches but Hyperscan's does not
+_HS_MISMATCHED = re.compile(r"[\x1c-\x1f]")
+
+def _build_prefilter() -> Any:
+    """Compile a Hyperscan database reporting whether any pattern may match.
+    
+    Patterns Hyperscan cannot compile exactly, like the SSN lookaheads, use
+    prefilter mode, which matches a superset. Returns None without
+    Hyperscan or if it rejects a pattern in both modes.
+    """
+    if hyperscan is None:
+        return None
+    modes = (
+        hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH,
+        hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_PREFILTER,
+    )
+    expressions = [pattern.encode() for pattern in PATTERNS.values()]
+    flags = []
+    for expression in expressions:
+        for mode in modes:
+            try:
+                hyperscan.Database().compile(
+                    expressions=[expression], ids=[0], elements=1, flags=[mode]
+                )
+            except hyperscan.error:
+                continue
+            flags.append(mode)
+            break
+        else:
+            return None
+    database = hyperscan.Database()
+    database.compile(
+        expressions=expressions, ids=list(range(len(expressions))),
+        elements=len(expressions), flags=flags
+    )
+    return database
+
+_PREFILTER = _build_prefilter()
+# Hyperscan scratch space cannot be shared by concurrent scans
+_hs_local = threading.local()
+
+def _may_contain_pii(text: str) -> bool:
+    """Whether any pattern may match text; False only when Hyperscan rules all out.
+    
+    Hyperscan only agrees with re's Unicode classes on ASCII text without
+    the separators in _HS_MISMATCHED, so other text is always scanned.
+    """
+    if _PREFILTER is None or not text.isascii() or _HS_MISMATCHED.search(text):
+        return True
+    scratch = getattr(_hs_local, "scratch", None)
+    if scratch is None:
+        scratch = _hs_local.scratch = hyperscan.Scratch(_PREFILTER)
+    found = []
+    _PREFILTER.scan(
+        text.encode(),
+        match_event_handler=lambda *match: found.append(match),
+        scratch=scratch
+    )
+    return bool(found)
+
+def load_yaml(path: Path) -> Any:
+    """Parse a YAML file with the fastest available safe loader."""
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=YamlLoader)
+
+def _scan_result(found: set) -> Dict[str, Any]:
+    detected_types = [pii_type for pii_type in PATTERNS if pii_type in found]
+    return {
+        "detected": len(detected_types) > 0,
+        "types": detected_types,
+        "count": len(detected_types)
+    }
+
+def mask(text: str) -> str:
+    """Replace every PII match in text with its type's mask."""
+    if not _may_contain_pii(text):
+        return text
+    return _UNION.sub(lambda match: REPLACEMENTS[match.lastgroup], text)
+
+def scan_and_mask(text: str) -> Tuple[Dict[str, Any], str]:
+    """Scan text for PII and mask it in the same pass."""
+    found = set()
+    if not _may_contain_pii(text):
+        return _scan_result(found), text
+    
+    def replace(match: re.Match) -> str:
+        found.add(match.lastgroup)
+        return REPLACEMENTS[match.lastgroup]
+    
+    masked_text = _UNION.sub(replace, text)
+    return _scan_result(found), masked_text
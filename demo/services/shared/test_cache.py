@@ -0,0 +1,22 @@
+"""
+Shared Response Cache Tests
+"""
+
+from shared.cache import RESPONSE_CACHE_MAX_TEXT_LEN, ResponseCache, content_hash
+
+def test_oversized_content_is_not_cached():
+    cache = ResponseCache()
+    text = "x" * (RESPONSE_CACHE_MAX_TEXT_LEN + 1)
+    key = content_hash(text, "pii")
+    assert key is None
+    cache.put(key, text)
+    assert cache.get(key) is None
+    assert len(cache._entries) == 0
+
+def test_content_up_to_the_limit_is_cached():
+    cache = ResponseCache()
+    text = "x" * RESPONSE_CACHE_MAX_TEXT_LEN
+    key = content_hash(text, "pii")
+    cache.put(key, text)
+    assert cache.get(key) == text
+    assert content_hash(text, "toxicity") != key
@@ -0,0 +1,48 @@
+"""
+Shared PII Matcher Tests
+"""
+
+import random
+
+import pytest
+
+from shared import pii
+
+EXAMPLES = [
+    "123-45-6789", "078051120", "john.doe@example.com", "X@Y.ORG", "(555) 123-4567",
+    "555.123.4567", "4111 1111 1111 1111", "4111-1111-1111-1111", "4111111111111111",
+]
+EDGE_CHARS = [" ", "\n", "\t", "\x0b", "\x1c", "\x1f", "\x85", "\xa0", "-", ".", "@", "٣", "１", "é", "K"]
+
+def build_corpus():
+    corpus = ["", "no pii here", "NO PII HERE"] + EXAMPLES
+    for example in EXAMPLES:
+        for char in EDGE_CHARS:
+            corpus += [char + example + char, example.replace("1", char), example.replace("-", char)]
+    rng = random.Random(1234)
+    alphabet = list("0123456789 -.@()abcxyzABCXYZ") + EDGE_CHARS
+    for _ in range(2000):
+        parts = [rng.choice(alphabet) for _ in range(rng.randint(0, 16))]
+        if rng.random() < 0.5:
+            parts.insert(rng.randint(0, len(parts)), rng.choice(EXAMPLES))
+        corpus.append("".join(parts))
+    return corpus
+
+def test_card_number_stops_before_next_number():
+    text = "Card 4111111111111111 123-45-6789"
+    assert pii.mask(text) == "Card ****-****-****-XXXX XXX-XX-XXXX"
+    result, masked_text = pii.scan_and_mask(text)
+    assert masked_text == "Card ****-****-****-XXXX XXX-XX-XXXX"
+    assert result["types"] == ["ssn", "credit_card"]
+
+def test_spaced_card_number_is_masked_whole():
+    assert pii.mask("pay 4111 1111 1111 1111 today") == "pay ****-****-****-XXXX today"
+
+@pytest.mark.skipif(pii._PREFILTER is None, reason="hyperscan is not installed")
+def test_prefilter_never_changes_results(monkeypatch):
+    corpus = build_corpus()
+    results = [(pii.scan_and_mask(text), pii.mask(text)) for text in corpus]
+    assert any(not pii._may_contain_pii(text) for text in corpus)
+    monkeypatch.setattr(pii, "_PREFILTER", None)
+    expected = [(pii.scan_and_mask(text), pii.mask(text)) for text in corpus]
+    assert results == expected